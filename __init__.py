@@ -1,3 +1,3 @@
 def classFactory(iface):
-    from .swipemaster import SwipeMasterPlugin
-    return SwipeMasterPlugin(iface)
\ No newline at end of file
+    from .plugin import SwipeMasterPlugin
+    return SwipeMasterPlugin(iface)
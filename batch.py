@@ -0,0 +1,217 @@
+"""Batch swipe comparisons over many extents in worker processes
+
+Each worker process starts its own headless QgsApplication, opens the
+compared layers from their sources and renders one before/after swipe
+image per extent with the same compositing as the swipe overlay.
+"""
+import multiprocessing
+import multiprocessing.spawn
+import os
+import shutil
+import subprocess
+import sys
+
+from qgis.PyQt.QtCore import QSize
+from qgis.PyQt.QtGui import QColor
+from qgis.core import (QgsApplication, QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsFeatureRequest,
+                       QgsMapLayerStyle, QgsMapRendererSequentialJob, QgsMapSettings, QgsProject, QgsRasterLayer,
+                       QgsRectangle, QgsVectorLayer)
+
+from .compositing import composite_swipe_frame
+
+# State of a worker process: its QgsApplication, layers and render options
+_worker = {}
+
+# Seconds a worker interpreter gets to show it can import QGIS
+STARTUP_TIMEOUT = 60
+
+
+def layer_definition(layer):
+    """What a worker process needs to open a layer again: source, provider and style"""
+    if layer.providerType() == "memory":
+        raise ValueError(f"{layer.name()} is a memory layer and cannot be opened by the batch workers")
+    style = QgsMapLayerStyle()
+    style.readFromLayer(layer)
+    return {
+        "kind": "vector" if isinstance(layer, QgsVectorLayer) else "raster",
+        "source": layer.source(),
+        "provider": layer.providerType(),
+        "name": layer.name(),
+        "style": style.xmlData(),
+        "crs": layer.crs().toWkt(),
+    }
+
+
+def open_layer(definition):
+    if definition["kind"] == "vector":
+        layer = QgsVectorLayer(definition["source"], definition["name"], definition["provider"])
+    else:
+        layer = QgsRasterLayer(definition["source"], definition["name"], definition["provider"])
+    if not layer.isValid():
+        raise RuntimeError(f"Could not open {definition['name']} in a batch worker")
+    layer.setCrs(QgsCoordinateReferenceSystem.fromWkt(definition["crs"]))
+    style = QgsMapLayerStyle(definition["style"])
+    style.writeToLayer(layer)
+    return layer
+
+
+def init_worker(prefix_path, before, after, options):
+    """Process pool initializer: only keeps its arguments
+    
+    A failing initializer makes the pool respawn workers forever, so QGIS
+    and the layers are set up by the first task, whose errors reach run().
+    """
+    _worker["prefix_path"] = prefix_path
+    _worker["definitions"] = (before, after)
+    _worker["options"] = options
+
+
+def start_worker():
+    """Headless QGIS and the compared layers, on the first task of a worker"""
+    if "app" in _worker:
+        return
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QgsApplication.setPrefixPath(_worker["prefix_path"], True)
+    app = QgsApplication([], False)
+    app.initQgis()
+    _worker["app"] = app
+    before, after = _worker["definitions"]
+    _worker["before"] = [open_layer(definition) for definition in before]
+    _worker["after"] = [open_layer(definition) for definition in after]
+
+
+def render_image(layers, extent, options, background):
+    settings = QgsMapSettings()
+    settings.setLayers(layers)
+    settings.setDestinationCrs(QgsCoordinateReferenceSystem.fromWkt(options["crs"]))
+    settings.setOutputSize(QSize(*options["size"]))
+    settings.setExtent(extent)
+    settings.setBackgroundColor(background)
+    job = QgsMapRendererSequentialJob(settings)
+    job.start()
+    job.waitForFinished()
+    return job.renderedImage()
+
+
+def render_comparison(task):
+    """Worker: render and write the swipe image of one extent, returns its path"""
+    name, extent, path = task
+    start_worker()
+    options = _worker["options"]
+    extent = QgsRectangle(*extent)
+    base = render_image(_worker["before"], extent, options, QColor(*options["background"]))
+    top = render_image(_worker["after"], extent, options, QColor(0, 0, 0, 0))
+
+    direction = options["direction"]
+    length = base.width() if direction in ["right", "left"] else base.height()
+    position = round(options["position"] * length)
+    frame = composite_swipe_frame(base, top, direction, position, options["layer_opacity"],
+                                  QColor(*options["line_color"]), options["line_width"])
+    if not frame.save(path):
+        raise OSError(f"Could not write {path}")
+    return path
+
+
+def python_executable():
+    """Python interpreter for the workers - inside QGIS sys.executable may be QGIS itself"""
+    executable = os.path.basename(sys.executable).lower()
+    if executable.startswith("python"):
+        return sys.executable
+    if sys.platform == "win32":
+        return os.path.join(sys.exec_prefix, "pythonw.exe")
+    return shutil.which("python3") or sys.executable
+
+
+def check_executable(executable):
+    """Fail fast if the worker interpreter cannot import QGIS"""
+    try:
+        result = subprocess.run([executable, "-c", "import qgis.core"], stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, timeout=STARTUP_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise RuntimeError(f"Could not start the batch workers with {executable}: {e}")
+    if result.returncode != 0:
+        error = result.stderr.decode(errors="replace").strip().splitlines()
+        raise RuntimeError(f"The batch workers ({executable}) cannot import QGIS: {error[-1] if error else ''}")
+
+
+def feature_extents(layer, crs, margin=0.05, selected_only=False):
+    """(name, extent) of every feature of a polygon or atlas coverage layer, grown by margin"""
+    transform = QgsCoordinateTransform(layer.crs(), crs, QgsProject.instance())
+    if selected_only:
+        features = layer.getSelectedFeatures()
+    else:
+        features = layer.getFeatures(QgsFeatureRequest().setNoAttributes())
+    extents = []
+    for feature in features:
+        if not feature.hasGeometry():
+            continue
+        extent = transform.transformBoundingBox(feature.geometry().boundingBox())
+        extent.scale(1.0 + margin)
+        extents.append((str(feature.id()), extent))
+    return extents
+
+
+class SwipeBatchExport:
+    """Write one swipe comparison image per extent using a pool of worker processes"""
+    def __init__(self, before_layers, after_layers, swipe_direction="right", position=0.5, size=QSize(1920, 1080),
+                 crs=None, background=QColor(255, 255, 255), line_color=QColor(255, 0, 0, 200), line_width=3,
+                 layer_opacity=0.0, workers=None):
+        self.before = [layer_definition(layer) for layer in before_layers]
+        self.after = [layer_definition(layer) for layer in after_layers]
+        self.crs = crs or after_layers[0].crs()
+        self.workers = workers or os.cpu_count() or 2
+        self.options = {
+            "direction": swipe_direction,
+            "position": max(0.0, min(position, 1.0)),
+            "size": (size.width(), size.height()),
+            "crs": self.crs.toWkt(),
+            "background": background.getRgb(),
+            "line_color": line_color.getRgb(),
+            "line_width": line_width,
+            "layer_opacity": layer_opacity,
+        }
+
+    def run(self, extents, folder, prefix="swipe", progress=None):
+        """Render (name, extent) pairs into folder, returns False if cancelled
+
+        progress is called with the number of written images and returns
+        False to cancel; it is also called while waiting, to keep a GUI alive.
+        """
+        os.makedirs(folder, exist_ok=True)
+        tasks = [(name, (extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum()),
+                  os.path.join(folder, f"{prefix}_{name}.png"))
+                 for name, extent in extents]
+        if not tasks:
+            return True
+
+        # Never fork a GUI process - spawned workers start clean
+        executable = python_executable()
+        check_executable(executable)
+        context = multiprocessing.get_context("spawn")
+        # The executable is global to multiprocessing - only set it while the workers start
+        previous_executable = multiprocessing.spawn.get_executable()
+        context.set_executable(executable)
+        try:
+            pool = context.Pool(min(self.workers, len(tasks)), initializer=init_worker,
+                                initargs=(QgsApplication.prefixPath(), self.before, self.after, self.options))
+        finally:
+            context.set_executable(previous_executable)
+        written = 0
+        try:
+            results = pool.imap_unordered(render_comparison, tasks)
+            while written < len(tasks):
+                try:
+                    results.next(timeout=0.1)
+                    written += 1
+                except multiprocessing.TimeoutError:
+                    pass
+                if progress and progress(written) is False:
+                    pool.terminate()
+                    return False
+            pool.close()
+            return True
+        except Exception:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
@@ -0,0 +1,414 @@
+"""Headless benchmark for the SwipeMaster swipe tool
+
+Replays press/move/release traces against SplitSwipeTool and
+SplitSwipeOverlay on an offscreen map canvas and reports frame times,
+render job counts, canvas refresh counts and peak memory.
+
+Run from the directory containing the plugin folder:
+
+    QT_QPA_PLATFORM=offscreen python -m SwipeMaster.benchmark --features 50000
+
+With --lifecycle N it instead activates and disposes the tool N times and
+checks that scene items, canvas signal connections and RSS stay flat,
+exiting with status 1 if they grow.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from qgis.PyQt.QtCore import Qt, QEvent, QPoint, QCoreApplication
+from qgis.PyQt.QtGui import QColor
+from qgis.core import (QgsApplication, QgsCoordinateReferenceSystem, QgsFeature, QgsGeometry,
+                       QgsRasterLayer, QgsRectangle, QgsVectorLayer)
+from qgis.gui import QgsMapCanvas, QgsMapMouseEvent
+
+from .swipemaster import SplitSwipeTool, SwipeTileCache, metrics
+
+DIRECTIONS = ["right", "left", "top", "bottom"]
+
+
+class CountingCanvas(QgsMapCanvas):
+    """Map canvas that counts refresh calls and its own map renders"""
+    def __init__(self):
+        super().__init__()
+        self.refresh_count = 0
+        self.render_count = 0
+        self.renderStarting.connect(self.count_render)
+
+    def refresh(self):
+        self.refresh_count += 1
+        super().refresh()
+
+    def count_render(self):
+        self.render_count += 1
+
+    def reset_counters(self):
+        self.refresh_count = 0
+        self.render_count = 0
+
+
+class BenchmarkPanel:
+    """Stands in for MinimalSwipeControlPanel, which needs the QGIS main window"""
+    def __init__(self, tile_cache):
+        self.tile_cache = tile_cache
+
+    def update_status(self, icon, tooltip=""):
+        pass
+
+    def tool_deactivated(self):
+        pass
+
+    def series_index_changed(self, index, layer):
+        pass
+
+    def cache_memory_text(self):
+        return ""
+
+    def difference_changed(self, stats):
+        pass
+
+    def identify_results(self, text):
+        pass
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def process_events(duration=0.0):
+    """Run the event loop for at least duration seconds"""
+    end = time.monotonic() + duration
+    while True:
+        QCoreApplication.processEvents()
+        if time.monotonic() >= end:
+            break
+        time.sleep(0.001)
+
+
+def build_raster(path, size, pixel_size):
+    """Write a random 3-band GeoTIFF of size x size pixels"""
+    from osgeo import gdal, osr
+    import numpy
+
+    driver = gdal.GetDriverByName("GTiff")
+    dataset = driver.Create(path, size, size, 3, gdal.GDT_Byte, ["TILED=YES"])
+    dataset.SetGeoTransform((0, pixel_size, 0, size * pixel_size, 0, -pixel_size))
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(3857)
+    dataset.SetProjection(srs.ExportToWkt())
+    for band in range(1, 4):
+        dataset.GetRasterBand(band).WriteArray(numpy.random.randint(0, 255, (size, size), dtype=numpy.uint8))
+    dataset = None
+
+    layer = QgsRasterLayer(path, "benchmark raster")
+    if not layer.isValid():
+        raise RuntimeError(f"Could not load benchmark raster {path}")
+    return layer
+
+
+def build_vector(feature_count, extent):
+    """Memory layer with feature_count random squares inside extent"""
+    layer = QgsVectorLayer("Polygon?crs=EPSG:3857", "benchmark polygons", "memory")
+    features = []
+    side = max(extent.width(), extent.height()) / max(1.0, feature_count ** 0.5)
+    for _ in range(feature_count):
+        x = random.uniform(extent.xMinimum(), extent.xMaximum())
+        y = random.uniform(extent.yMinimum(), extent.yMaximum())
+        feature = QgsFeature()
+        feature.setGeometry(QgsGeometry.fromRect(QgsRectangle(x, y, x + side, y + side)))
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    layer.updateExtents()
+    return layer
+
+
+def generate_trace(direction, width, height, steps, duration_ms):
+    """Press in the middle, sweep to both edges and back, release"""
+    horizontal = direction in ["right", "left"]
+    length = width if horizontal else height
+    positions = [length // 2]
+    for step in range(1, steps + 1):
+        # Triangle wave over the whole canvas
+        phase = step / steps * 2
+        position = phase if phase <= 1 else 2 - phase
+        positions.append(int(position * (length - 1)))
+
+    trace = []
+    for index, position in enumerate(positions):
+        x, y = (position, height // 2) if horizontal else (width // 2, position)
+        event_type = "press" if index == 0 else "move"
+        trace.append({"type": event_type, "x": x, "y": y, "t": index * duration_ms / steps})
+    last = trace[-1]
+    trace.append({"type": "release", "x": last["x"], "y": last["y"], "t": last["t"]})
+    return trace
+
+
+def load_trace(path):
+    """A recorded trace: JSON list of {type: press|move|release, x, y, t (ms)}"""
+    with open(path) as trace_file:
+        return json.load(trace_file)
+
+
+def wait_for_overlay(tool, timeout=60.0):
+    """Wait until the overlay has finished its background renders"""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        QCoreApplication.processEvents()
+        overlay = tool.overlay
+        if overlay and "base" in overlay.images and not overlay.render_jobs and not overlay.preview:
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def replay(canvas, tool, trace):
+    """Replay a trace in real time and time every repaint it causes"""
+    event_types = {
+        "press": QEvent.MouseButtonPress,
+        "move": QEvent.MouseMove,
+        "release": QEvent.MouseButtonRelease,
+    }
+    frame_times = []
+    start = time.monotonic()
+    last_frame = None
+
+    for entry in trace:
+        # Keep the recorded timing so the frame scheduler sees realistic input
+        delay = start + entry["t"] / 1000.0 - time.monotonic()
+        if delay > 0:
+            process_events(delay)
+
+        buttons = Qt.NoButton if entry["type"] == "release" else Qt.LeftButton
+        event = QgsMapMouseEvent(canvas, event_types[entry["type"]], QPoint(int(entry["x"]), int(entry["y"])),
+                                 Qt.LeftButton, buttons, Qt.NoModifier)
+        if entry["type"] == "press":
+            tool.canvasPressEvent(event)
+        elif entry["type"] == "move":
+            tool.canvasMoveEvent(event)
+        else:
+            tool.canvasReleaseEvent(event)
+        QCoreApplication.processEvents()
+
+        overlay = tool.overlay
+        frame = (overlay.split_position, overlay.split_position_y)
+        if frame != last_frame:
+            # A new position reached the overlay - time the repaint it needs
+            frame_start = time.perf_counter()
+            canvas.viewport().repaint()
+            frame_times.append((time.perf_counter() - frame_start) * 1000.0)
+            last_frame = frame
+
+    process_events(0.05)
+    return frame_times
+
+
+def run_direction(canvas, layers, direction, trace, tile_cache):
+    panel = BenchmarkPanel(tile_cache)
+    metrics.reset()
+    canvas.reset_counters()
+
+    tool = SplitSwipeTool(canvas, layers, QColor(255, 0, 0, 200), 3, panel, swipe_direction=direction,
+                          layer_opacity=0.5, max_fps=60, tile_cache=tile_cache)
+    tool.create_overlay()
+    canvas.setMapTool(tool)
+    setup_start = time.perf_counter()
+    ready = wait_for_overlay(tool)
+    setup_time = (time.perf_counter() - setup_start) * 1000.0
+    setup_jobs = metrics.counters.get("render_jobs_started", 0)
+
+    # Only the drag itself from here on
+    metrics.reset()
+    canvas.reset_counters()
+    frame_times = replay(canvas, tool, trace)
+
+    result = {
+        "direction": direction,
+        "ready": ready,
+        "setup_ms": round(setup_time, 2),
+        "setup_render_jobs": setup_jobs,
+        "events": len(trace),
+        "frames": len(frame_times),
+        "frame_ms_p50": round(percentile(frame_times, 0.50), 3),
+        "frame_ms_p95": round(percentile(frame_times, 0.95), 3),
+        "frame_ms_p99": round(percentile(frame_times, 0.99), 3),
+        "drag_render_jobs": metrics.counters.get("render_jobs_started", 0),
+        "drag_render_jobs_cancelled": metrics.counters.get("render_jobs_cancelled", 0),
+        "drag_canvas_renders": canvas.render_count,
+        "drag_canvas_refresh_calls": canvas.refresh_count,
+        "drag_metrics": metrics.to_dict(),
+    }
+
+    tool.dispose()
+    return result
+
+
+def current_rss_mb():
+    """Resident memory now (Linux), falling back to the peak elsewhere"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0), 1)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+def lifecycle_snapshot(canvas):
+    """What a leaking tool or overlay would leave behind on the canvas"""
+    return {
+        "scene_items": len(canvas.scene().items()),
+        "extents_changed_receivers": canvas.receivers(canvas.extentsChanged),
+        "scale_changed_receivers": canvas.receivers(canvas.scaleChanged),
+        "refreshed_receivers": canvas.receivers(canvas.mapCanvasRefreshed),
+        "rss_mb": current_rss_mb(),
+    }
+
+
+def run_lifecycle(canvas, layers, tile_cache, iterations, warmup, rss_tolerance_mb):
+    """Activate and dispose the tool repeatedly, like start_tool and on_layer_changed do"""
+    panel = BenchmarkPanel(tile_cache)
+    directions = DIRECTIONS + ["quad", "lens"]
+    snapshots = {}
+    for iteration in range(iterations):
+        tool = SplitSwipeTool(canvas, layers, QColor(255, 0, 0, 200), 3, panel,
+                              swipe_direction=directions[iteration % len(directions)], layer_opacity=0.5,
+                              max_fps=60, tile_cache=tile_cache)
+        tool.create_overlay()
+        canvas.setMapTool(tool)
+        wait_for_overlay(tool)
+        tool.dispose()
+        # Let deleteLater run
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        QCoreApplication.processEvents()
+        if iteration + 1 == warmup:
+            snapshots["after_warmup"] = lifecycle_snapshot(canvas)
+    snapshots["end"] = lifecycle_snapshot(canvas)
+    start = snapshots.get("after_warmup", snapshots["end"])
+    end = snapshots["end"]
+
+    failures = [name for name in ["scene_items", "extents_changed_receivers", "scale_changed_receivers",
+                                  "refreshed_receivers"] if end[name] > start[name]]
+    if end["rss_mb"] is not None and end["rss_mb"] - start["rss_mb"] > rss_tolerance_mb:
+        failures.append("rss_mb")
+    return {
+        "iterations": iterations,
+        "warmup": warmup,
+        "snapshots": snapshots,
+        "failures": failures,
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1)
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SwipeMaster drag performance headlessly")
+    parser.add_argument("--raster-size", type=int, default=4096, help="Synthetic raster width and height in pixels")
+    parser.add_argument("--features", type=int, default=20000, help="Number of synthetic polygons")
+    parser.add_argument("--canvas", default="1920x1080", help="Canvas size, e.g. 1920x1080")
+    parser.add_argument("--directions", default=",".join(DIRECTIONS), help="Comma separated swipe directions")
+    parser.add_argument("--steps", type=int, default=300, help="Mouse moves per generated trace")
+    parser.add_argument("--duration", type=float, default=2000.0, help="Duration of a generated trace in ms")
+    parser.add_argument("--trace", help="Replay a recorded trace (JSON) instead of generated ones")
+    parser.add_argument("--save-trace", help="Write the generated trace of the first direction to this file")
+    parser.add_argument("--cache-mb", type=int, default=256, help="Tile cache budget")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--lifecycle", type=int, metavar="N",
+                        help="Activate and dispose the tool N times and check for leaks instead")
+    parser.add_argument("--rss-tolerance", type=float, default=20.0, help="Allowed RSS growth in MB for --lifecycle")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QgsApplication([], True)
+    app.initQgis()
+
+    # Render jobs and hot path timings come from the built-in instrumentation
+    metrics.enabled = True
+
+    width, height = parse_size(args.canvas)
+    workdir = tempfile.mkdtemp(prefix="swipemaster-benchmark-")
+    raster = build_raster(os.path.join(workdir, "raster.tif"), args.raster_size, 1.0)
+    vector = build_vector(args.features, raster.extent())
+
+    canvas = CountingCanvas()
+    canvas.resize(width, height)
+    canvas.setDestinationCrs(QgsCoordinateReferenceSystem("EPSG:3857"))
+    canvas.setLayers([vector, raster])
+    canvas.setExtent(raster.extent())
+    canvas.show()
+    canvas.refresh()
+    canvas.waitWhileRendering()
+
+    tile_cache = SwipeTileCache(args.cache_mb * 1024 * 1024)
+    if args.lifecycle:
+        report = run_lifecycle(canvas, [vector], tile_cache, args.lifecycle, min(50, args.lifecycle // 10), args.rss_tolerance)
+        for name, snapshot in report["snapshots"].items():
+            print(f"{name:>12}: " + "  ".join(f"{key} {value}" for key, value in snapshot.items()))
+        print("lifecycle: " + ("leaks in " + ", ".join(report["failures"]) if report["failures"] else "flat"))
+        if args.json:
+            with open(args.json, "w") as json_file:
+                json.dump(report, json_file, indent=2)
+        canvas.close()
+        app.exitQgis()
+        sys.exit(1 if report["failures"] else 0)
+
+    results = []
+    for direction in [d.strip() for d in args.directions.split(",") if d.strip()]:
+        if args.trace:
+            trace = load_trace(args.trace)
+        else:
+            trace = generate_trace(direction, width, height, args.steps, args.duration)
+            if args.save_trace and not results:
+                with open(args.save_trace, "w") as trace_file:
+                    json.dump(trace, trace_file)
+        results.append(run_direction(canvas, [vector], direction, trace, tile_cache))
+
+    report = {
+        "canvas": [width, height],
+        "raster_size": args.raster_size,
+        "features": args.features,
+        "results": results,
+        "cache": tile_cache.memory_usage(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+    for result in results:
+        print(f"{result['direction']:>6}: {result['frames']:4d} frames  "
+              f"p50 {result['frame_ms_p50']:.2f} ms  p95 {result['frame_ms_p95']:.2f} ms  "
+              f"p99 {result['frame_ms_p99']:.2f} ms  drag render jobs {result['drag_render_jobs']}  "
+              f"canvas renders {result['drag_canvas_renders']}  refresh calls {result['drag_canvas_refresh_calls']}")
+    print(f"peak RSS {report['peak_rss_mb']} MB, swipe cache peak "
+          f"{report['cache']['peak'] / (1024 * 1024):.1f} MB")
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(report, json_file, indent=2)
+
+    canvas.close()
+    app.exitQgis()
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
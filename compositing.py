@@ -0,0 +1,52 @@
+"""Swipe frame compositing shared by the plugin and the batch worker processes
+
+Only uses QtCore and QtGui, so worker processes can import it without
+loading the QGIS GUI.
+"""
+from qgis.PyQt.QtCore import QRectF
+from qgis.PyQt.QtGui import QImage, QPainter, QPen
+
+
+def swipe_rects(swipe_direction, position, width, height):
+    """(visible, hidden) rects of the swiped layer for a split direction"""
+    before_x = QRectF(0, 0, position, height)
+    after_x = QRectF(position, 0, width - position, height)
+    before_y = QRectF(0, 0, width, position)
+    after_y = QRectF(0, position, width, height - position)
+    if swipe_direction == "right":
+        # Swipe from right: left of line shows base layer, right shows selected layer
+        return after_x, before_x
+    if swipe_direction == "left":
+        # Swipe from left: right of line shows base layer, left shows selected layer
+        return before_x, after_x
+    if swipe_direction == "top":
+        # Swipe from top: below line shows base layer, above shows selected layer
+        return before_y, after_y
+    # Swipe from bottom: above line shows base layer, below shows selected layer
+    return after_y, before_y
+
+
+def composite_swipe_frame(base, top, swipe_direction, position, layer_opacity, line_color, line_width):
+    """One swipe frame from a base and a top image of the same size
+    
+    Only uses QImage and QPainter, so frames can be composited in worker threads.
+    """
+    frame = base.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    width, height = frame.width(), frame.height()
+    visible_rect, hidden_rect = swipe_rects(swipe_direction, position, width, height)
+    
+    painter = QPainter(frame)
+    painter.drawImage(visible_rect, top, visible_rect)
+    if layer_opacity > 0:
+        painter.setOpacity(layer_opacity)
+        painter.drawImage(hidden_rect, top, hidden_rect)
+        painter.setOpacity(1.0)
+    pen = QPen(line_color)
+    pen.setWidth(line_width)
+    painter.setPen(pen)
+    if swipe_direction in ["right", "left"]:
+        painter.drawLine(position, 0, position, height)
+    else:
+        painter.drawLine(0, position, width, position)
+    painter.end()
+    return frame
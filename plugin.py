@@ -0,0 +1,62 @@
+import os
+import time
+
+from qgis.PyQt.QtGui import QIcon
+from qgis.PyQt.QtWidgets import QAction
+from qgis.core import QgsMessageLog, Qgis
+
+
+class SwipeMasterPlugin:
+    """Toolbar entry of SwipeMaster
+    
+    Kept light on purpose: the swipe panel, tools and renderers live in
+    swipemaster.py and are imported the first time the button is pressed.
+    """
+    def __init__(self, iface):
+        self.iface = iface
+        self.control_panel = None
+        # Get the directory where this plugin is located
+        self.plugin_dir = os.path.dirname(__file__)
+
+    def initGui(self):
+        """Create the menu entries and toolbar icons inside the QGIS GUI."""
+        start = time.perf_counter()
+        # Create icon path
+        icon_path = os.path.join(self.plugin_dir, 'swipemaster.png')
+        
+        self.action = QAction(
+            QIcon(icon_path),
+            "SwipeMaster",
+            self.iface.mainWindow()
+        )
+        self.action.triggered.connect(self.run)
+        self.iface.addToolBarIcon(self.action)
+        self.iface.addPluginToMenu("SwipeMaster", self.action)
+        self.log_timing("Startup", start)
+
+    def unload(self):
+        """Removes the plugin menu item and icon from QGIS GUI."""
+        self.iface.removePluginMenu("SwipeMaster", self.action)
+        self.iface.removeToolBarIcon(self.action)
+        if self.control_panel:
+            self.control_panel.shutdown()
+            self.control_panel = None
+
+    def run(self):
+        """Run method that performs all the real work"""
+        start = None
+        if self.control_panel is None:
+            # First use: load the swipe module and build the panel once,
+            # later opens reuse it
+            start = time.perf_counter()
+            from .swipemaster import MinimalSwipeControlPanel
+            self.control_panel = MinimalSwipeControlPanel()
+        self.control_panel.show()
+        self.control_panel.raise_()
+        self.control_panel.activateWindow()
+        if start is not None:
+            self.log_timing("First open", start)
+
+    def log_timing(self, step, start):
+        elapsed = (time.perf_counter() - start) * 1000.0
+        QgsMessageLog.logMessage(f"{step}: {elapsed:.1f} ms", "SwipeMaster", Qgis.Info)
@@ -1,59 +1,162 @@
-from qgis.PyQt.QtCore import Qt, QRectF
-from qgis.PyQt.QtGui import QPainter, QCursor, QPen, QColor, QPixmap, QIcon
+from qgis.PyQt import sip
+from qgis.PyQt.QtCore import Qt, QPoint, QPointF, QRect, QRectF, QSize, QTimer, QSortFilterProxyModel
+from qgis.PyQt.QtGui import (QPainter, QPainterPath, QCursor, QPen, QColor, QPixmap, QIcon, QImage,
+                             QStandardItem, QStandardItemModel)
 from qgis.PyQt.QtWidgets import (QDialog, QHBoxLayout, QLabel, QComboBox, 
-                                QPushButton, QMessageBox, QColorDialog, QAction)
-from qgis.gui import QgsMapTool, QgsMapCanvasItem
-from qgis.core import QgsMapSettings, QgsMapRendererCustomPainterJob
+                                QPushButton, QMessageBox, QColorDialog,
+                                QGraphicsItem, QSlider, QFileDialog, QCompleter, QProgressDialog,
+                                QFormLayout, QSpinBox, QCheckBox, QLineEdit, QDialogButtonBox, QToolTip)
+from qgis.gui import QgsMapTool, QgsMapCanvasItem, QgsMapLayerComboBox
+from qgis.core import (QgsMapSettings, QgsMapRendererParallelJob, QgsMapLayerStyle, QgsRectangle,
+                       QgsMapLayer, QgsProject, QgsLayerTreeGroup, QgsMessageLog, Qgis, QgsVectorLayer,
+                       QgsVectorSimplifyMethod, QgsMapLayerProxyModel, QgsApplication, QgsProviderRegistry,
+                       QgsSpatialIndex, QgsFeatureRequest, QgsVectorLayerFeatureSource, QgsCoordinateTransform,
+                       QgsCsException, QgsGeometry, QgsRaster, QgsRasterLayer, QgsExpression, QgsExpressionContext,
+                       QgsExpressionContextUtils)
 from qgis.utils import iface
+import hashlib
+import json
+import math
+import mmap
 import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
 
-class SwipeMasterPlugin:
-    def __init__(self, iface):
-        self.iface = iface
-        self.control_panel = None
-        # Get the directory where this plugin is located
-        self.plugin_dir = os.path.dirname(__file__)
-
-    def initGui(self):
-        """Create the menu entries and toolbar icons inside the QGIS GUI."""
-        # Create icon path
-        icon_path = os.path.join(self.plugin_dir, 'swipemaster.png')
-        
-        self.action = QAction(
-            QIcon(icon_path),
-            "SwipeMaster",
-            self.iface.mainWindow()
-        )
-        self.action.triggered.connect(self.run)
-        self.iface.addToolBarIcon(self.action)
-        self.iface.addPluginToMenu("SwipeMaster", self.action)
-
-    def unload(self):
-        """Removes the plugin menu item and icon from QGIS GUI."""
-        self.iface.removePluginMenu("SwipeMaster", self.action)
-        self.iface.removeToolBarIcon(self.action)
-        if self.control_panel:
-            self.control_panel.close()
+from .compositing import swipe_rects, composite_swipe_frame
+
+try:
+    import numpy
+except ImportError:  # Difference mode is unavailable without NumPy
+    numpy = None
+
+# Size in pixels of the tiles kept in the swipe render cache
+TILE_SIZE = 256
+
+# Number of panes of the quad (cross) split
+QUAD_PANES = 4
+
+# Simplification tolerance in pixels for the swipe render while interacting
+INTERACTION_SIMPLIFY_THRESHOLD = 4.0
+
+# A pixel counts as changed when a colour channel differs by more than this (0-255)
+DIFFERENCE_THRESHOLD = 16
 
-    def run(self):
-        """Run method that performs all the real work"""
-        if self.control_panel is None or not self.control_panel.isVisible():
-            self.control_panel = MinimalSwipeControlPanel()
-        self.control_panel.show()
-        self.control_panel.raise_()
-        self.control_panel.activateWindow()
+# Identify: search radius in pixels, features listed per layer, and how much
+# more than the view the identify index covers so small pans reuse it
+IDENTIFY_TOLERANCE = 5
+IDENTIFY_LIMIT = 3
+IDENTIFY_INDEX_MARGIN = 1.5
+
+# The lens renders this much more than its own size around the cursor,
+# so small cursor moves are served from the last lens render
+LENS_MARGIN = 1.5
+
+def difference_text(stats):
+    """Status text for the (total, swipe side) changed fractions of difference mode"""
+    total, swipe_side = stats
+    return f"Δ {total:.1%} changed, {swipe_side:.1%} on the swipe side"
+
+class SwipeMetrics:
+    """Call counts, timings and event counters of the swipe hot paths
+    
+    Only recorded while enabled (the diagnostics toggle of the panel), so
+    the hot paths pay a single attribute check otherwise.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+        
+    def reset(self):
+        self.calls = {}
+        self.total_ms = {}
+        self.max_ms = {}
+        # Recent durations per hot path, for percentiles
+        self.recent_ms = {}
+        self.counters = {}
+        self.started = time.time()
+        
+    def timed(self, name):
+        """Decorator counting and timing calls of a hot path"""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, (time.perf_counter() - start) * 1000.0)
+            return wrapper
+        return decorator
+        
+    def record(self, name, duration_ms):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.total_ms[name] = self.total_ms.get(name, 0.0) + duration_ms
+        self.max_ms[name] = max(self.max_ms.get(name, 0.0), duration_ms)
+        if name not in self.recent_ms:
+            self.recent_ms[name] = deque(maxlen=1000)
+        self.recent_ms[name].append(duration_ms)
+        
+    def count(self, name, amount=1):
+        """Count an event such as a cache hit or a started render job"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            
+    def to_dict(self):
+        timings = {}
+        for name, calls in self.calls.items():
+            recent = sorted(self.recent_ms[name])
+            timings[name] = {
+                "calls": calls,
+                "total_ms": round(self.total_ms[name], 3),
+                "mean_ms": round(self.total_ms[name] / calls, 3),
+                "p95_ms": round(recent[int(0.95 * (len(recent) - 1))], 3),
+                "max_ms": round(self.max_ms[name], 3),
+            }
+        return {
+            "duration_s": round(time.time() - self.started, 1),
+            "timings": timings,
+            "counters": dict(self.counters),
+        }
+        
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+        
+    def summary(self):
+        """One line per hot path and counter"""
+        data = self.to_dict()
+        lines = [f"SwipeMaster diagnostics over {data['duration_s']} s"]
+        for name, timing in sorted(data["timings"].items()):
+            lines.append(f"{name}: {timing['calls']} calls, mean {timing['mean_ms']:.3f} ms, "
+                         f"p95 {timing['p95_ms']:.3f} ms, max {timing['max_ms']:.3f} ms")
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+        
+    def log(self):
+        QgsMessageLog.logMessage(self.summary(), "SwipeMaster", Qgis.Info)
 
+# Shared by every panel, tool and overlay
+metrics = SwipeMetrics()
 
 class MinimalSwipeControlPanel(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("SwipeMaster - Swipe Tool")
         self.setModal(False)
-        self.setFixedSize(600, 60)
+        self.setFixedSize(980, 60)
         
         self.setWindowFlags(Qt.Window | Qt.WindowStaysOnTopHint | Qt.CustomizeWindowHint | Qt.WindowCloseButtonHint)
         
-        self.selected_layer = None
+        self.selected_layers = []
+        self.current_target = None
         self.current_tool = None
         self.swipe_direction = "right"  # Default direction: right
         
@@ -62,6 +165,29 @@ class MinimalSwipeControlPanel(QDialog):
         self.line_width = 3
         self.line_opacity = 200
         self.layer_opacity = 0.0  # Default layer opacity in hidden area
+        self.max_fps = 60  # Upper bound for swipe repaints while dragging
+        self.cache_budget_mb = 256  # Memory kept for recently rendered swipe tiles
+        self.time_series = False  # Step through the target layers one at a time
+        self.prefetch_count = 2  # Neighbouring dates rendered ahead in time-series mode
+        self.lens_shape = "circle"  # Spyglass shape: circle or rect
+        self.lens_size = 300  # Spyglass diameter in pixels
+        self.lens_magnification = 1.0
+        self.preview_ratio = 0.25  # Resolution of the first, coarse render of an uncached view (1.0 disables)
+        self.refine_delay_ms = 400  # Idle time before the coarse render is refined
+        self.simplified_layers = set()  # Vector layer ids drawn simplified and without labels while interacting
+        self.difference = False  # Show a change heatmap instead of the swiped layer
+        self.linked = False  # Swipe every open map view, not only the main canvas
+        self.export_frames = 120  # Frames of an animated export, one sweep from edge to edge
+        self.export_fps = 30
+        
+        # Shared by every tool and overlay created from this panel, so
+        # going back to a recently seen view is served from memory
+        self.tile_cache = SwipeTileCache(self.cache_budget_mb * 1024 * 1024)
+        
+        # Optional: swipe tiles of file based layers kept on disk across sessions
+        self.disk_cache_mb = 2048
+        self.disk_cache_dir = os.path.join(QgsApplication.qgisSettingsDirPath(), "cache", "swipemaster")
+        self.disk_cache = None
         
         self.setup_ui()
         self.load_layers()
@@ -84,13 +210,25 @@ class MinimalSwipeControlPanel(QDialog):
         main_layout.setSpacing(3)
         main_layout.setContentsMargins(5, 5, 5, 5)
         
-        # Layer combo box
+        # Layer combo box - editable for type-ahead search, the popup shows full names
         self.layer_combo = QComboBox()
         self.layer_combo.setMinimumWidth(80)
         self.layer_combo.setMaximumWidth(120)
+        self.layer_combo.setEditable(True)
+        self.layer_combo.setInsertPolicy(QComboBox.NoInsert)
+        self.layer_combo.view().setMinimumWidth(300)
         self.layer_combo.currentIndexChanged.connect(self.on_layer_changed)
+        self.layer_combo.setToolTip("Layer to swipe - type to search")
         main_layout.addWidget(self.layer_combo)
         
+        # Per layer: simplified geometries and no labels while dragging or navigating
+        self.simplify_button = QPushButton("〰")
+        self.simplify_button.setFixedWidth(30)
+        self.simplify_button.setCheckable(True)
+        self.simplify_button.toggled.connect(self.on_simplify_toggled)
+        self.simplify_button.setToolTip("Simplify geometries and skip labels of this layer while dragging or navigating")
+        main_layout.addWidget(self.simplify_button)
+        
         sep1 = QLabel("|")
         sep1.setStyleSheet("color: #ccc;")
         sep1.setFixedWidth(5)
@@ -103,6 +241,14 @@ class MinimalSwipeControlPanel(QDialog):
         self.direction_combo.addItem("Left", "left")
         self.direction_combo.addItem("Top", "top")
         self.direction_combo.addItem("Bottom", "bottom")
+        self.direction_combo.addItem("Quad", "quad")
+        self.direction_combo.setItemData(self.direction_combo.count() - 1,
+                                         "Cross split - each layer of the group or selection gets its own pane",
+                                         Qt.ToolTipRole)
+        self.direction_combo.addItem("Lens", "lens")
+        self.direction_combo.setItemData(self.direction_combo.count() - 1,
+                                         "Spyglass following the cursor - Shift+wheel: zoom, Ctrl+wheel: size",
+                                         Qt.ToolTipRole)
         self.direction_combo.currentIndexChanged.connect(self.on_direction_changed)
         self.direction_combo.setToolTip("Swipe direction")
         main_layout.addWidget(self.direction_combo)
@@ -204,6 +350,58 @@ class MinimalSwipeControlPanel(QDialog):
         sep6.setFixedWidth(5)
         main_layout.addWidget(sep6)
         
+        # Time series toggle and date slider
+        self.series_button = QPushButton("⏱")
+        self.series_button.setFixedWidth(30)
+        self.series_button.setCheckable(True)
+        self.series_button.toggled.connect(self.on_time_series_toggled)
+        self.series_button.setToolTip("Time series: step through the layers of the group or selection (PageUp/PageDown)")
+        main_layout.addWidget(self.series_button)
+        
+        self.series_slider = QSlider(Qt.Horizontal)
+        self.series_slider.setFixedWidth(110)
+        self.series_slider.setMinimum(0)
+        self.series_slider.setMaximum(0)
+        self.series_slider.setEnabled(False)
+        self.series_slider.valueChanged.connect(self.on_series_slider_changed)
+        self.series_slider.setToolTip("Date")
+        main_layout.addWidget(self.series_slider)
+        
+        # Linked swipe over all map views
+        self.linked_button = QPushButton("🔗")
+        self.linked_button.setFixedWidth(30)
+        self.linked_button.setCheckable(True)
+        self.linked_button.toggled.connect(self.on_linked_toggled)
+        self.linked_button.setToolTip("Linked: swipe all map views together, dragging on the main canvas")
+        main_layout.addWidget(self.linked_button)
+        
+        # Difference mode - change heatmap on the swipe side
+        self.difference_button = QPushButton("Δ")
+        self.difference_button.setFixedWidth(30)
+        self.difference_button.setCheckable(True)
+        self.difference_button.toggled.connect(self.on_difference_toggled)
+        self.difference_button.setToolTip("Difference: show where the swiped layer changes the map as a heatmap")
+        main_layout.addWidget(self.difference_button)
+        
+        # Animated export of a full sweep of the line
+        self.export_button = QPushButton("🎞")
+        self.export_button.setFixedWidth(30)
+        self.export_button.clicked.connect(self.export_animation)
+        self.export_button.setToolTip("Export a sweep of the swipe line as PNG frames, GIF or video")
+        main_layout.addWidget(self.export_button)
+        
+        # Batch snapshots over many extents
+        self.batch_button = QPushButton("📦")
+        self.batch_button.setFixedWidth(30)
+        self.batch_button.clicked.connect(self.open_batch_dialog)
+        self.batch_button.setToolTip("Batch: write one swipe comparison per feature of a polygon layer")
+        main_layout.addWidget(self.batch_button)
+        
+        sep7 = QLabel("|")
+        sep7.setStyleSheet("color: #ccc;")
+        sep7.setFixedWidth(5)
+        main_layout.addWidget(sep7)
+        
         # Start button
         self.start_button = QPushButton("▶️")
         self.start_button.setFixedWidth(40)
@@ -248,6 +446,22 @@ class MinimalSwipeControlPanel(QDialog):
         self.status_label.setStyleSheet("color: #666; font-size: 14px;")
         main_layout.addWidget(self.status_label)
         
+        # Disk cache toggle - swipe renders reused across sessions
+        self.disk_cache_button = QPushButton("💾")
+        self.disk_cache_button.setFixedWidth(30)
+        self.disk_cache_button.setCheckable(True)
+        self.disk_cache_button.toggled.connect(self.on_disk_cache_toggled)
+        self.disk_cache_button.setToolTip("Disk cache: keep swipe renders of file based layers for the next session")
+        main_layout.addWidget(self.disk_cache_button)
+        
+        # Diagnostics toggle - records hot path timings while checked
+        self.diagnostics_button = QPushButton("📊")
+        self.diagnostics_button.setFixedWidth(30)
+        self.diagnostics_button.setCheckable(True)
+        self.diagnostics_button.toggled.connect(self.on_diagnostics_toggled)
+        self.diagnostics_button.setToolTip("Diagnostics: record swipe timings, then log and export them as JSON")
+        main_layout.addWidget(self.diagnostics_button)
+        
     def on_direction_changed(self):
         if self.direction_combo.currentIndex() >= 0:
             self.swipe_direction = self.direction_combo.currentData()
@@ -263,42 +477,180 @@ class MinimalSwipeControlPanel(QDialog):
         self.activateWindow()
         
     def load_layers(self):
-        layers = iface.mapCanvas().layers()
-        self.layer_combo.clear()
+        # Kept in sync with the project, so it is only built once
+        self.layer_model = SwipeLayerModel(QgsProject.instance(), self)
+        self.layer_proxy = QSortFilterProxyModel(self)
+        self.layer_proxy.setSourceModel(self.layer_model)
+        self.layer_proxy.setSortRole(SwipeLayerModel.SortRole)
+        self.layer_proxy.setSortCaseSensitivity(Qt.CaseInsensitive)
+        self.layer_proxy.setDynamicSortFilter(True)
+        self.layer_proxy.sort(0)
+        self.layer_combo.setModel(self.layer_proxy)
         
-        for layer in layers:
-            layer_name = layer.name()
-            if len(layer_name) > 15:
-                layer_name = layer_name[:12] + "..."
-            self.layer_combo.addItem(layer_name, layer)
+        # Type-ahead: matches anywhere in the layer name
+        self.layer_completer = QCompleter(self.layer_proxy, self)
+        self.layer_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.layer_completer.setFilterMode(Qt.MatchContains)
+        self.layer_completer.setCompletionMode(QCompleter.PopupCompletion)
+        self.layer_completer.activated.connect(self.on_layer_searched)
+        self.layer_combo.setCompleter(self.layer_completer)
+        
+        # Preselect the topmost layer of the map, like before
+        canvas_layers = iface.mapCanvas().layers()
+        if canvas_layers:
+            index = self.layer_combo.findData(canvas_layers[0])
+            if index >= 0:
+                self.layer_combo.setCurrentIndex(index)
             
-        if layers:
-            self.selected_layer = layers[0]
+        self.selected_layers = self.swipe_layers()
+        self.current_target = self.layer_combo.currentData()
+        self.update_simplify_button()
+        if self.selected_layers:
             self.update_status("✅", "Ready")
         else:
             self.update_status("❌", "Error")
+            
+    def on_layer_searched(self, text):
+        index = self.layer_combo.findText(text)
+        if index >= 0:
+            self.layer_combo.setCurrentIndex(index)
+        
+    def swipe_layers(self):
+        """Layers of the current swipe target, topmost first"""
+        data = self.layer_combo.currentData()
+        if isinstance(data, QgsMapLayer):
+            return [data]
+        if isinstance(data, QgsLayerTreeGroup):
+            # Only the group members currently shown on the map
+            return [node.layer() for node in data.findLayers() if node.layer() and node.isVisible()]
+        if data == "selection":
+            return iface.layerTreeView().selectedLayers()
+        return []
         
     def on_layer_changed(self):
         if self.layer_combo.currentIndex() >= 0:
-            self.selected_layer = self.layer_combo.currentData()
+            # Rows move when layers are added or renamed - only a new target counts
+            target = self.layer_combo.currentData()
+            if target == self.current_target:
+                return
+            self.current_target = target
+            self.selected_layers = self.swipe_layers()
+            self.update_simplify_button()
             
             # If tool is active, stop it completely
-            if self.current_tool:
-                # First reset opacity of previous layer
-                if self.current_tool.layer:
-                    self.current_tool.layer.setOpacity(1)
-                    self.current_tool.layer.triggerRepaint()
-                
-                # Then deactivate the tool
-                self.current_tool.deactivate()
-                # Ensure complete cleanup
-                if hasattr(self.current_tool, 'cleanup'):
-                    self.current_tool.cleanup()
-                self.current_tool = None
+            self.stop_tool()
                 
             # Reset status
             self.update_status("✅", "Layer changed - Ready to activate")
             self.start_button.setEnabled(True)
+            
+    def vector_layers(self, layers):
+        return [layer for layer in layers if isinstance(layer, QgsVectorLayer)]
+        
+    def update_simplify_button(self):
+        """Reflect the interaction simplification of the current target"""
+        layers = self.vector_layers(self.selected_layers)
+        self.simplify_button.blockSignals(True)
+        self.simplify_button.setEnabled(bool(layers))
+        self.simplify_button.setChecked(any(layer.id() in self.simplified_layers for layer in layers))
+        self.simplify_button.blockSignals(False)
+        
+    def on_simplify_toggled(self, checked):
+        """Only the swipe render is simplified - the layer settings are untouched"""
+        for layer in self.vector_layers(self.swipe_layers()):
+            if checked:
+                self.simplified_layers.add(layer.id())
+            else:
+                self.simplified_layers.discard(layer.id())
+        if self.current_tool:
+            self.current_tool.set_simplified_layers(self.simplified_layers)
+            
+    def stop_tool(self):
+        """The panel owns the tool, the tool owns its overlays and their connections"""
+        if self.current_tool:
+            # The layer itself is never modified, so there is nothing to restore
+            self.current_tool.dispose()
+            self.current_tool = None
+            
+    def on_time_series_toggled(self, checked):
+        """Time series mode takes effect on the next activation"""
+        self.time_series = checked
+        self.stop_tool()
+        self.series_slider.setEnabled(False)
+        self.update_status("✅", "Time series on - Ready to activate" if checked else "Time series off - Ready to activate")
+        self.start_button.setEnabled(True)
+        
+    def on_series_slider_changed(self, value):
+        if self.current_tool:
+            self.current_tool.set_series_index(value)
+            
+    def series_index_changed(self, index, layer):
+        """Called by the tool when it steps to another date"""
+        self.series_slider.blockSignals(True)
+        self.series_slider.setValue(index)
+        self.series_slider.blockSignals(False)
+        self.series_slider.setToolTip(layer.name())
+        self.update_status("🔄", f"Date {index + 1}/{self.series_slider.maximum() + 1}: {layer.name()}")
+                
+    def on_linked_toggled(self, checked):
+        """Linked mode takes effect on the next activation"""
+        self.linked = checked
+        self.stop_tool()
+        self.update_status("✅", "Linked views on - Ready to activate" if checked else "Linked views off - Ready to activate")
+        self.start_button.setEnabled(True)
+        
+    def on_difference_toggled(self, checked):
+        if checked and numpy is None:
+            QMessageBox.warning(self, "Error", "Difference mode needs NumPy, which is not installed!")
+            self.difference_button.setChecked(False)
+            return
+        self.difference = checked
+        if self.current_tool:
+            self.current_tool.set_difference(checked)
+            
+    def export_animation(self):
+        """Export a sweep of the active swipe over the current map extent"""
+        if not self.current_tool or not self.current_tool.overlay:
+            QMessageBox.warning(self, "Error", "Please activate the swipe tool first!")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export swipe animation", "swipe.gif",
+                                              "Animated GIF (*.gif);;Video (*.mp4);;PNG frames (*.png)")
+        if not path:
+            return
+            
+        canvas = iface.mapCanvas()
+        export = SwipeAnimationExport(self.current_tool.overlay, canvas.extent(), canvas.size(),
+                                      self.export_frames, self.export_fps)
+        progress_dialog = QProgressDialog("Exporting swipe animation...", "Cancel", 0, export.frame_count, self)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        
+        def progress(written):
+            progress_dialog.setValue(written)
+            return not progress_dialog.wasCanceled()
+            
+        self.update_status("🔄", "Exporting animation")
+        try:
+            finished = export.export(path, progress)
+            self.update_status("✅", "Animation exported" if finished else "Export cancelled")
+        except (OSError, RuntimeError, ValueError) as e:
+            QMessageBox.warning(self, "Error", f"Could not export the animation: {str(e)}")
+            self.update_status("❌", "Export failed")
+        finally:
+            progress_dialog.close()
+            
+    def open_batch_dialog(self):
+        dialog = SwipeBatchDialog(self)
+        dialog.exec_()
+        
+    def identify_results(self, text):
+        """Called by the tool with the result of a Ctrl+click identify"""
+        self.update_status("🔎", text)
+        QToolTip.showText(QCursor.pos(), text)
+        
+    def difference_changed(self, stats):
+        """Called by the tool when the change statistics were recomputed"""
+        self.difference_button.setToolTip(difference_text(stats))
+        self.update_status("🔄", difference_text(stats))
                 
     def on_color_changed(self):
         if self.color_combo.currentData() is None:
@@ -327,7 +679,7 @@ class MinimalSwipeControlPanel(QDialog):
         self.apply_settings_to_tool()
         
     def on_layer_opacity_changed(self):
-        """When layer opacity is changed"""
+        """When layer opacity is changed - only the swipe composite is redrawn, the layer is untouched"""
         self.layer_opacity = self.layer_opacity_combo.currentData()
         self.apply_layer_opacity_settings()
         
@@ -344,9 +696,16 @@ class MinimalSwipeControlPanel(QDialog):
             self.current_tool.line_color = self.line_color
             self.current_tool.line_width = self.line_width
             
-            # If overlay exists, update it
-            if self.current_tool.overlay:
-                self.current_tool.overlay.set_line_style(self.line_color, self.line_width)
+            # If overlays exist, update them
+            for overlay in self.current_tool.overlays():
+                overlay.set_line_style(self.line_color, self.line_width)
+        
+    def cache_memory_text(self):
+        """Current and peak memory used by cached swipe images"""
+        usage = self.tile_cache.memory_usage()
+        megabyte = 1024 * 1024
+        return (f"Cache: {usage['current'] / megabyte:.1f} MB "
+                f"(peak {usage['peak'] / megabyte:.1f} MB, limit {usage['budget'] / megabyte:.0f} MB)")
         
     def update_status(self, icon, tooltip=""):
         self.status_label.setText(icon)
@@ -360,20 +719,31 @@ class MinimalSwipeControlPanel(QDialog):
             self.status_label.setStyleSheet("color: blue; font-size: 14px;")
             
     def start_tool(self):
-        if not self.selected_layer:
+        # The layer tree selection may have changed since the target was picked
+        self.selected_layers = self.swipe_layers()
+        if not self.selected_layers:
             QMessageBox.warning(self, "Error", "Please select a layer!")
             return
             
         try:
             # Ensure cleanup of previous tool
-            if self.current_tool:
-                self.current_tool.deactivate()
-                if hasattr(self.current_tool, 'cleanup'):
-                    self.current_tool.cleanup()
-                self.current_tool = None
+            self.stop_tool()
                 
+            # In time-series mode the target layers are swiped one date at a time
+            series = self.selected_layers if self.time_series and len(self.selected_layers) > 1 else None
+            
             canvas = iface.mapCanvas()
-            self.current_tool = SplitSwipeTool(canvas, self.selected_layer, self.line_color, self.line_width, self, self.swipe_direction, self.layer_opacity)
+            # Extra 2D map views share the tile cache, so views showing the same map render once
+            linked_canvases = iface.mapCanvases() if self.linked else []
+            self.current_tool = SplitSwipeTool(canvas, self.selected_layers, self.line_color, self.line_width, self,
+                                               swipe_direction=self.swipe_direction, layer_opacity=self.layer_opacity,
+                                               max_fps=self.max_fps, tile_cache=self.tile_cache,
+                                               series=series, prefetch_count=self.prefetch_count,
+                                               lens_shape=self.lens_shape, lens_size=self.lens_size,
+                                               lens_magnification=self.lens_magnification,
+                                               preview_ratio=self.preview_ratio, refine_delay_ms=self.refine_delay_ms,
+                                               simplified_layers=self.simplified_layers, difference=self.difference,
+                                               linked_canvases=linked_canvases)
             
             # Create overlay immediately after activating tool
             self.current_tool.create_overlay()
@@ -381,6 +751,10 @@ class MinimalSwipeControlPanel(QDialog):
             canvas.setMapTool(self.current_tool)
             
             self.update_status("🔄", f"Active - Direction: {self.swipe_direction.capitalize()}")
+            if series:
+                self.series_slider.setMaximum(len(series) - 1)
+                self.series_slider.setEnabled(True)
+                self.series_index_changed(0, series[0])
             self.start_button.setEnabled(False)
             
             self.raise_()
@@ -395,78 +769,1555 @@ class MinimalSwipeControlPanel(QDialog):
         self.update_status("✅", f"Ready - Direction: {self.swipe_direction.capitalize()}")
         self.start_button.setEnabled(True)
             
+    def on_disk_cache_toggled(self, checked):
+        if checked and self.disk_cache is None:
+            try:
+                self.disk_cache = SwipeDiskCache(self.disk_cache_dir, self.disk_cache_mb * 1024 * 1024)
+            except OSError as e:
+                QMessageBox.warning(self, "Error", f"Could not open the disk cache: {str(e)}")
+                self.disk_cache_button.setChecked(False)
+                return
+        self.tile_cache.disk_cache = self.disk_cache if checked else None
+        if self.disk_cache:
+            usage = self.disk_cache.memory_usage()
+            self.disk_cache_button.setToolTip(f"Disk cache: {usage['files']} tiles, "
+                                              f"{usage['bytes'] / (1024 * 1024):.0f} of {self.disk_cache_mb} MB")
+        
+    def on_diagnostics_toggled(self, checked):
+        """Start recording metrics, or stop and report them"""
+        if checked:
+            metrics.reset()
+            metrics.enabled = True
+            self.update_status("🔄", "Diagnostics recording")
+            return
+            
+        metrics.enabled = False
+        metrics.log()
+        self.diagnostics_button.setToolTip(metrics.summary())
+        
+        path, _ = QFileDialog.getSaveFileName(self, "Export diagnostics", "swipemaster-diagnostics.json", "JSON (*.json)")
+        if path:
+            data = metrics.to_dict()
+            data["cache"] = self.tile_cache.memory_usage()
+            if self.disk_cache:
+                data["disk_cache"] = self.disk_cache.memory_usage()
+            try:
+                with open(path, "w") as diagnostics_file:
+                    json.dump(data, diagnostics_file, indent=2)
+            except OSError as e:
+                QMessageBox.warning(self, "Error", f"Could not write diagnostics: {str(e)}")
+                
     def close_application(self):
-        if self.current_tool:
-            self.current_tool.deactivate()
-            if hasattr(self.current_tool, 'cleanup'):
-                self.current_tool.cleanup()
         self.close()
         
     def closeEvent(self, event):
-        if self.current_tool:
-            self.current_tool.deactivate()
-            if hasattr(self.current_tool, 'cleanup'):
-                self.current_tool.cleanup()
+        self.stop_tool()
+        # The panel is hidden, not destroyed - keep the layer model, free the renders
+        self.tile_cache.clear()
+        if metrics.enabled:
+            metrics.enabled = False
+            metrics.log()
+            self.diagnostics_button.blockSignals(True)
+            self.diagnostics_button.setChecked(False)
+            self.diagnostics_button.blockSignals(False)
+        self.update_status("✅", "Ready")
+        self.start_button.setEnabled(True)
         event.accept()
+        
+    def shutdown(self):
+        """Close for good when the plugin is unloaded"""
+        self.close()
+        self.layer_model.release()
+        if self.disk_cache:
+            # Let pending tile writes finish
+            self.disk_cache.close()
+        self.deleteLater()
+
+class SwipeBatchDialog(QDialog):
+    """Settings of a batch comparison export, run in worker processes"""
+    def __init__(self, panel):
+        super().__init__(panel)
+        self.panel = panel
+        self.setWindowTitle("SwipeMaster - Batch Export")
+        layout = QFormLayout(self)
+        
+        self.before_combo = QgsMapLayerComboBox()
+        layout.addRow("Before", self.before_combo)
+        self.after_combo = QgsMapLayerComboBox()
+        if panel.selected_layers:
+            self.after_combo.setLayer(panel.selected_layers[0])
+        layout.addRow("After (swiped)", self.after_combo)
+        
+        # One image per feature - a polygon layer or an atlas coverage layer
+        self.coverage_combo = QgsMapLayerComboBox()
+        self.coverage_combo.setFilters(QgsMapLayerProxyModel.PolygonLayer)
+        layout.addRow("Extents from", self.coverage_combo)
+        self.selected_check = QCheckBox("Selected features only")
+        layout.addRow("", self.selected_check)
+        
+        self.direction_combo = QComboBox()
+        for direction in ["right", "left", "top", "bottom"]:
+            self.direction_combo.addItem(direction.capitalize(), direction)
+        if panel.swipe_direction in ["right", "left", "top", "bottom"]:
+            self.direction_combo.setCurrentIndex(self.direction_combo.findData(panel.swipe_direction))
+        layout.addRow("Direction", self.direction_combo)
+        
+        self.position_spin = QSpinBox()
+        self.position_spin.setRange(0, 100)
+        self.position_spin.setValue(50)
+        self.position_spin.setSuffix(" %")
+        layout.addRow("Line position", self.position_spin)
+        
+        self.width_spin = QSpinBox()
+        self.width_spin.setRange(100, 10000)
+        self.width_spin.setValue(1920)
+        layout.addRow("Width (px)", self.width_spin)
+        self.height_spin = QSpinBox()
+        self.height_spin.setRange(100, 10000)
+        self.height_spin.setValue(1080)
+        layout.addRow("Height (px)", self.height_spin)
+        
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(os.cpu_count() or 2)
+        layout.addRow("Worker processes", self.workers_spin)
+        
+        folder_layout = QHBoxLayout()
+        self.folder_edit = QLineEdit()
+        browse_button = QPushButton("...")
+        browse_button.setFixedWidth(30)
+        browse_button.clicked.connect(self.browse_folder)
+        folder_layout.addWidget(self.folder_edit)
+        folder_layout.addWidget(browse_button)
+        layout.addRow("Output folder", folder_layout)
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.run_export)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+        
+    def browse_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Output folder", self.folder_edit.text())
+        if folder:
+            self.folder_edit.setText(folder)
+            
+    def run_export(self):
+        before = self.before_combo.currentLayer()
+        after = self.after_combo.currentLayer()
+        coverage = self.coverage_combo.currentLayer()
+        folder = self.folder_edit.text()
+        if not before or not after or not coverage or not folder:
+            QMessageBox.warning(self, "Error", "Please choose both layers, the extent layer and an output folder!")
+            return
+            
+        # Loaded on first use; the worker processes never import this module
+        from .batch import SwipeBatchExport, feature_extents
+        
+        canvas = iface.mapCanvas()
+        crs = canvas.mapSettings().destinationCrs()
+        try:
+            export = SwipeBatchExport([before], [after], self.direction_combo.currentData(),
+                                      self.position_spin.value() / 100.0,
+                                      QSize(self.width_spin.value(), self.height_spin.value()), crs,
+                                      canvas.canvasColor(), self.panel.line_color, self.panel.line_width,
+                                      self.panel.layer_opacity, self.workers_spin.value())
+            extents = feature_extents(coverage, crs, selected_only=self.selected_check.isChecked())
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except QgsCsException as e:
+            QMessageBox.warning(self, "Error", f"Could not transform the extents to the map CRS: {str(e)}")
+            return
+            
+        progress_dialog = QProgressDialog("Exporting swipe comparisons...", "Cancel", 0, len(extents), self)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        
+        def progress(written):
+            progress_dialog.setValue(written)
+            return not progress_dialog.wasCanceled()
+            
+        try:
+            finished = export.run(extents, folder, "swipe", progress)
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Batch export failed: {str(e)}")
+            return
+        finally:
+            progress_dialog.close()
+        self.panel.update_status("✅", f"{len(extents)} comparisons exported" if finished else "Batch export cancelled")
+        self.accept()
+
+class SwipeLayerModel(QStandardItemModel):
+    """Project layers, layer groups and the selection entry
+    
+    Updated incrementally from QgsProject signals instead of being rebuilt,
+    so it stays fast and current in projects with thousands of layers.
+    """
+    SortRole = Qt.UserRole + 1
+    
+    def __init__(self, project, parent=None):
+        super().__init__(parent)
+        self.project = project
+        self.root = project.layerTreeRoot()
+        self.layer_items = {}
+        self.name_slots = {}
+        # Group rows by the address of their layer tree node
+        self.group_items = {}
+        
+        selection_item = QStandardItem("☑ Selected")
+        selection_item.setData("selection", Qt.UserRole)
+        selection_item.setData("2", self.SortRole)
+        selection_item.setToolTip("Layers selected in the Layers panel")
+        selection_item.setEditable(False)
+        self.appendRow(selection_item)
+        
+        self.add_layers(list(project.mapLayers().values()))
+        self.refresh_groups()
+        
+        # Groups are few but tree changes come in bursts - refresh once per burst
+        self.group_timer = QTimer(self)
+        self.group_timer.setSingleShot(True)
+        self.group_timer.timeout.connect(self.refresh_groups)
+        
+        project.layersAdded.connect(self.add_layers)
+        project.layersWillBeRemoved.connect(self.remove_layers)
+        self.root.addedChildren.connect(self.schedule_group_refresh)
+        self.root.removedChildren.connect(self.schedule_group_refresh)
+        self.root.nameChanged.connect(self.schedule_group_refresh)
+        
+    def layer_item(self, layer):
+        item = QStandardItem(layer.name())
+        item.setData(layer, Qt.UserRole)
+        item.setData("0" + layer.name(), self.SortRole)
+        item.setToolTip(layer.name())
+        item.setEditable(False)
+        return item
+        
+    def add_layers(self, layers):
+        items = []
+        for layer in layers:
+            layer_id = layer.id()
+            if layer_id in self.layer_items:
+                continue
+            item = self.layer_item(layer)
+            self.layer_items[layer_id] = item
+            slot = partial(self.rename_layer, layer_id)
+            layer.nameChanged.connect(slot)
+            self.name_slots[layer_id] = (layer, slot)
+            items.append(item)
+        if items:
+            # One insertion for the whole batch
+            self.invisibleRootItem().appendRows(items)
+            
+    def remove_layers(self, layer_ids):
+        for layer_id in layer_ids:
+            item = self.layer_items.pop(layer_id, None)
+            layer, slot = self.name_slots.pop(layer_id, (None, None))
+            if layer is not None:
+                try:
+                    layer.nameChanged.disconnect(slot)
+                except (RuntimeError, TypeError):
+                    pass
+            if item is not None:
+                self.removeRow(item.row())
+                
+    def rename_layer(self, layer_id):
+        item = self.layer_items.get(layer_id)
+        if item is None:
+            return
+        name = item.data(Qt.UserRole).name()
+        item.setText(name)
+        item.setToolTip(name)
+        item.setData("0" + name, self.SortRole)
+        
+    def schedule_group_refresh(self, *args):
+        self.group_timer.start(0)
+        
+    def refresh_groups(self):
+        """Sync the group rows with the layer tree groups in place
+        
+        Rows of groups that still exist are kept, so a selected group does
+        not lose its row when another part of the tree changes.
+        """
+        groups = {sip.unwrapinstance(group): group for group in self.layer_groups(self.root)}
+        for key in [key for key in self.group_items if key not in groups]:
+            item = self.group_items.pop(key)
+            self.removeRow(item.row())
+            
+        new_items = []
+        for key, group in groups.items():
+            item = self.group_items.get(key)
+            if item is None:
+                item = QStandardItem()
+                item.setEditable(False)
+                self.group_items[key] = item
+                new_items.append(item)
+            item.setData(group, Qt.UserRole)
+            if item.text() != f"📁 {group.name()}":
+                item.setText(f"📁 {group.name()}")
+                item.setData("1" + group.name(), self.SortRole)
+                item.setToolTip(group.name())
+        if new_items:
+            self.invisibleRootItem().appendRows(new_items)
+            
+    def layer_groups(self, group):
+        """All layer tree groups below group, depth first"""
+        groups = []
+        for child in group.children():
+            if isinstance(child, QgsLayerTreeGroup):
+                groups.append(child)
+                groups.extend(self.layer_groups(child))
+        return groups
+        
+    def release(self):
+        """Disconnect from the project and its layers"""
+        self.group_timer.stop()
+        try:
+            self.project.layersAdded.disconnect(self.add_layers)
+            self.project.layersWillBeRemoved.disconnect(self.remove_layers)
+            self.root.addedChildren.disconnect(self.schedule_group_refresh)
+            self.root.removedChildren.disconnect(self.schedule_group_refresh)
+            self.root.nameChanged.disconnect(self.schedule_group_refresh)
+        except (RuntimeError, TypeError):
+            pass
+        self.remove_layers(list(self.layer_items))
+
+class SwipeTileCache:
+    """LRU cache of rendered swipe tiles, kept under a byte budget
+    
+    The budget also covers the images overlays currently display, so the
+    whole swipe image memory of a session stays below max_bytes.
+    """
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        # Tile key -> (image, memory map it lives in or None); the map has to
+        # stay with the image, neither sip.voidptr nor QImage keeps it alive
+        self.tiles = OrderedDict()
+        self.tile_bytes = 0
+        self.disk_cache = None
+        self.held_images = {}
+        self.held_bytes = 0
+        self.peak_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        
+        # Style hashes and signal connections of the layers seen so far
+        self.style_hashes = {}
+        self.persistable = {}
+        self.watched_layers = {}
+        # Layers repainted during this session: selections, edits or refreshes
+        # change their render without changing the source or style, so their
+        # tiles on disk may be stale and new ones are not written
+        self.volatile_layers = set()
+        
+        # Renders in progress by their first tile key, with the callbacks of
+        # overlays (e.g. on linked canvases) waiting for the same tiles
+        self.rendering = {}
+        
+    def style_hash(self, layer):
+        """Digest of the layer source and style, so restyled layers never hit old tiles
+        
+        Stable across sessions, and for file based layers it also covers the
+        file size and modification time, so the disk cache can use it.
+        """
+        layer_id = layer.id()
+        if layer_id not in self.style_hashes:
+            style = QgsMapLayerStyle()
+            style.readFromLayer(layer)
+            stamp = self.source_stamp(layer)
+            digest = hashlib.sha1()
+            for part in (layer.providerType(), layer.source(), style.xmlData(), repr(stamp)):
+                digest.update(part.encode("utf-8"))
+            self.style_hashes[layer_id] = digest.hexdigest()
+            # Unsaved edits and database sources can change without a trace on disk
+            editable = isinstance(layer, QgsVectorLayer) and layer.isEditable()
+            self.persistable[layer_id] = stamp is not None and not editable and layer_id not in self.volatile_layers
+        return self.style_hashes[layer_id]
+        
+    def source_stamp(self, layer):
+        """(size, modification time) of the file behind a layer, or None"""
+        path = QgsProviderRegistry.instance().decodeUri(layer.providerType(), layer.source()).get("path")
+        if not path:
+            path = layer.source().split("|")[0]
+        try:
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        return (stat.st_size, stat.st_mtime)
+        
+    def persistable_key(self, key):
+        return self.disk_cache is not None and all(self.persistable.get(layer_id) for layer_id in key[0])
+        
+    def tile_key(self, layers, settings, background, col, row):
+        """Key of a tile: layers, styles, CRS, resolution, DPI, pixel ratio, time, background and tile position
+        
+        Map units per pixel alone is not the scale: at another DPI (canvas
+        magnification, screens) symbols and labels are drawn at other sizes.
+        """
+        crs = settings.destinationCrs()
+        return (tuple(layer.id() for layer in layers),
+                tuple(self.style_hash(layer) for layer in layers),
+                crs.authid() or crs.toWkt(),
+                round(settings.mapUnitsPerPixel(), 12),
+                round(settings.outputDpi(), 6),
+                settings.devicePixelRatio(),
+                self.temporal_key(settings),
+                background.rgba(),
+                col, row)
+        
+    def temporal_key(self, settings):
+        """Time range the view shows (QGIS 3.14+), or None"""
+        if not hasattr(settings, "isTemporal") or not settings.isTemporal():
+            return None
+        time_range = settings.temporalRange()
+        return (time_range.begin().toString(Qt.ISODateWithMs), time_range.end().toString(Qt.ISODateWithMs),
+                time_range.includeBeginning(), time_range.includeEnd())
+        
+    def __contains__(self, key):
+        # Plain membership test - does not count as a hit or refresh the entry
+        return key in self.tiles
+        
+    def get(self, key):
+        """(image, buffer) of a tile, or None - keep the buffer for as long as the image is used"""
+        entry = self.tiles.get(key)
+        if entry is not None:
+            self.tiles.move_to_end(key)
+        elif self.persistable_key(key):
+            # Mapped straight from the disk cache, no decoding
+            image, buffer = self.disk_cache.load(key)
+            if image is not None:
+                entry = (image, buffer)
+                # Stored as the most recent entry, put never evicts it
+                self.put(key, image, buffer)
+                metrics.count("disk_cache_hits")
+        if entry is None:
+            self.misses += 1
+            metrics.count("tile_cache_misses")
+            return None
+        self.hits += 1
+        metrics.count("tile_cache_hits")
+        return entry
+        
+    def claim(self, key):
+        """Claim the render of the tiles starting at key, False if another overlay renders them"""
+        if key in self.rendering:
+            return False
+        self.rendering[key] = []
+        return True
+        
+    def wait_for(self, key, callback):
+        """Call back once the claimed render of key has finished or was given up"""
+        self.rendering[key].append(callback)
+        
+    def release(self, key):
+        for callback in self.rendering.pop(key, []):
+            callback()
+            
+    @property
+    def total_bytes(self):
+        return self.tile_bytes + self.held_bytes
+        
+    def put(self, key, image, buffer=None):
+        """Keep a tile; buffer is the memory map an image from the disk cache lives in"""
+        if key in self.tiles:
+            self.drop(key)
+        self.tiles[key] = (image, buffer)
+        self.tile_bytes += image.sizeInBytes()
+        self.evict(keep=key)
+        
+    def stored(self, key):
+        """Whether a tile is in memory or in the disk cache, without loading it"""
+        if key in self.tiles:
+            return True
+        return self.persistable_key(key) and self.disk_cache.file_name(key) in self.disk_cache.files
+        
+    def persist(self, key, image):
+        """Also write a tile to the disk cache, if enabled and the layers allow it"""
+        if self.persistable_key(key):
+            self.disk_cache.save(key, image)
+        
+    def drop(self, key):
+        # Images handed out by get() keep their memory map through the entry
+        image, _ = self.tiles.pop(key)
+        self.tile_bytes -= image.sizeInBytes()
+        
+    def hold_images(self, owner, images):
+        """Account for the images an overlay keeps on screen"""
+        self.held_images[id(owner)] = sum(image.sizeInBytes() for image in images if image is not None)
+        if not self.held_images[id(owner)]:
+            del self.held_images[id(owner)]
+        self.held_bytes = sum(self.held_images.values())
+        self.evict()
+        
+    def evict(self, keep=None):
+        """Evict least recently used tiles until the budget is met, never the tile keep"""
+        self.peak_bytes = max(self.peak_bytes, self.total_bytes)
+        while self.total_bytes > self.max_bytes and self.tiles:
+            key = next(iter(self.tiles))
+            if key == keep:
+                break
+            self.drop(key)
+            
+    def memory_usage(self):
+        """Current and peak swipe image memory in bytes"""
+        return {
+            "current": self.total_bytes,
+            "peak": self.peak_bytes,
+            "tiles": self.tile_bytes,
+            "displayed": self.held_bytes,
+            "budget": self.max_bytes,
+            "tile_count": len(self.tiles),
+        }
+            
+    def watch_layers(self, layers):
+        """Invalidate tiles of a layer whenever it is repainted or restyled"""
+        for layer in layers:
+            layer_id = layer.id()
+            if layer_id in self.watched_layers:
+                continue
+            slot = partial(self.invalidate_layer, layer_id)
+            layer.repaintRequested.connect(slot)
+            layer.styleChanged.connect(slot)
+            self.watched_layers[layer_id] = (layer, slot)
+            
+    def invalidate_layer(self, layer_id):
+        self.volatile_layers.add(layer_id)
+        self.style_hashes.pop(layer_id, None)
+        self.persistable.pop(layer_id, None)
+        for key in [key for key in self.tiles if layer_id in key[0]]:
+            self.drop(key)
+            
+    def clear(self):
+        for layer, slot in self.watched_layers.values():
+            try:
+                layer.repaintRequested.disconnect(slot)
+                layer.styleChanged.disconnect(slot)
+            except (RuntimeError, TypeError):
+                # Layer already deleted
+                pass
+        self.watched_layers = {}
+        self.style_hashes = {}
+        self.persistable = {}
+        self.tiles = OrderedDict()
+        self.tile_bytes = 0
+
+class SwipeDiskCache:
+    """Swipe tiles kept on disk across sessions, with a size cap and LRU eviction
+    
+    Tiles are stored as raw image buffers behind a small header and memory
+    mapped back in on a hit, so reading one costs no decoding. Files are
+    written and deleted by a single background thread.
+    """
+    MAGIC = b"SWT1"
+    # Magic, width, height, bytes per line, image format, device pixel ratio
+    HEADER = struct.Struct("<4sIIIId")
+    # Pixel data starts here, aligned for 32-bit images
+    HEADER_SIZE = 64
+    
+    def __init__(self, folder, max_bytes=2048 * 1024 * 1024):
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writer = ThreadPoolExecutor(max_workers=1)
+        
+        # File name -> size, least recently used first
+        self.files = OrderedDict()
+        self.total_bytes = 0
+        entries = [entry for entry in os.scandir(folder) if entry.name.endswith(".tile")]
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            self.files[entry.name] = entry.stat().st_size
+            self.total_bytes += entry.stat().st_size
+        self.evict()
+        
+    def file_name(self, key):
+        """Everything but the layer ids, which are only unique within a project"""
+        return hashlib.sha1(repr(key[1:]).encode("utf-8")).hexdigest() + ".tile"
+        
+    def load(self, key):
+        """(image, memory map it lives in) of a stored tile, or (None, None)"""
+        name = self.file_name(key)
+        if name not in self.files:
+            self.misses += 1
+            return None, None
+        path = os.path.join(self.folder, name)
+        try:
+            with open(path, "rb") as tile_file:
+                # Copy on write: the image may be painted on without touching the file
+                mapped = mmap.mmap(tile_file.fileno(), 0, access=mmap.ACCESS_COPY)
+            magic, width, height, bytes_per_line, image_format, ratio = self.HEADER.unpack_from(mapped)
+            if magic != self.MAGIC or len(mapped) < self.HEADER_SIZE + bytes_per_line * height:
+                raise ValueError("Truncated or foreign tile file")
+        except (OSError, ValueError, struct.error):
+            self.forget(name)
+            self.misses += 1
+            return None, None
+            
+        address = int(sip.voidptr(mapped)) + self.HEADER_SIZE
+        image = QImage(sip.voidptr(address), width, height, bytes_per_line, QImage.Format(image_format))
+        image.setDevicePixelRatio(ratio)
+        self.files.move_to_end(name)
+        self.writer.submit(self.touch_file, path)
+        self.hits += 1
+        return image, mapped
+        
+    def save(self, key, image):
+        name = self.file_name(key)
+        if name in self.files:
+            return
+        header = self.HEADER.pack(self.MAGIC, image.width(), image.height(), image.bytesPerLine(),
+                                  int(image.format()), image.devicePixelRatio())
+        bits = image.constBits()
+        bits.setsize(image.bytesPerLine() * image.height())
+        # Copied here, the image may change or go away before the write runs
+        data = header.ljust(self.HEADER_SIZE, b"\0") + bytes(bits)
+        self.files[name] = len(data)
+        self.total_bytes += len(data)
+        self.writer.submit(self.write_file, name, data)
+        self.evict()
+        
+    def evict(self):
+        while self.total_bytes > self.max_bytes and self.files:
+            self.forget(next(iter(self.files)))
+            
+    def forget(self, name):
+        self.total_bytes -= self.files.pop(name, 0)
+        self.writer.submit(self.remove_file, os.path.join(self.folder, name))
+        
+    def write_file(self, name, data):
+        path = os.path.join(self.folder, name)
+        temporary = path + ".part"
+        try:
+            with open(temporary, "wb") as tile_file:
+                tile_file.write(data)
+            # Readers never see a half written tile
+            os.replace(temporary, path)
+        except OSError as e:
+            QgsMessageLog.logMessage(f"Could not write disk cache tile: {str(e)}", "SwipeMaster", Qgis.Warning)
+            
+    def touch_file(self, path):
+        try:
+            # Modification time is the recency order used on the next start
+            os.utime(path)
+        except OSError:
+            pass
+            
+    def remove_file(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+            
+    def memory_usage(self):
+        return {
+            "bytes": self.total_bytes,
+            "budget": self.max_bytes,
+            "files": len(self.files),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+        
+    def close(self):
+        self.writer.shutdown(wait=True)
 
 class SplitSwipeOverlay(QgsMapCanvasItem):
-    def __init__(self, canvas, layer, line_color=QColor(255, 0, 0, 200), line_width=3, swipe_direction="right"):
+    def __init__(self, canvas, layers, line_color=QColor(255, 0, 0, 200), line_width=3, swipe_direction="right", layer_opacity=0.0, tile_cache=None,
+                 excluded_layers=None, *, prefetch_layers=None, lens_shape="circle", lens_size=300, lens_magnification=1.0,
+                 preview_ratio=0.25, refine_delay_ms=400, simplified_layers=None):
         super().__init__(canvas)
         self.canvas = canvas
-        self.layer = layer
+        # Swiped layers, topmost first - rendered together as one image
+        self.layers = list(layers)
+        # Layers never drawn in the base image, e.g. the other dates of a time series
+        self.excluded_layers = list(excluded_layers or [])
+        self.tile_cache = tile_cache if tile_cache is not None else SwipeTileCache()
         self.swipe_direction = swipe_direction
+        self.layer_opacity = layer_opacity
         
         # Initial line position based on direction
-        if swipe_direction in ["right", "left"]:
+        if swipe_direction in ["right", "left", "quad"]:
             self.split_position = canvas.width() // 2
         else:  # top, bottom
             self.split_position = canvas.height() // 2
+        # Horizontal line of the quad split
+        self.split_position_y = canvas.height() // 2
             
+        # Previous line position, used to invalidate only the strip that changed
+        self.previous_position = self.split_position
+        self.previous_position_y = self.split_position_y
+        self.item_size = (canvas.width(), canvas.height())
+        
         self.setZValue(1000)
+        # Needed to get the exposed (dirty) rect in paint
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
         
         self.line_color = line_color
         self.line_width = line_width
         
-        self.canvas.extentsChanged.connect(self.update_cache)
-        self.canvas.scaleChanged.connect(self.update_cache)
+        # Navigation makes running renders stale; the cache is rebuilt
+        # once the canvas has finished rendering the new view
+        self.canvas.extentsChanged.connect(self.view_changed)
+        self.canvas.scaleChanged.connect(self.view_changed)
+        self.canvas.mapCanvasRefreshed.connect(self.update_cache)
+        
+        # Offscreen renders by name: "base" holds every canvas layer except the
+        # swiped ones, "top" the swiped layers alone and "pane0".."pane3" one
+        # layer each in quad mode. Dragging only re-composites these.
+        self.images = {}
+        
+        # Extent the cached images were rendered at, used to transform them
+        # to the current view while navigating
+        self.image_extent = None
+        self.pending_extent = None
+        
+        # Background render jobs, tagged with the generation they were started for
+        self.generation = 0
+        self.render_jobs = {}
+        self.cancelled_jobs = []
+        self.pending_images = {}
+        # Tile renders claimed in the shared cache, and renders of other overlays waited for
+        self.claims = {}
+        self.shared_waits = {}
+        
+        # Swipe targets rendered ahead into the tile cache for the current view,
+        # with at most max_prefetch_jobs renders running at a time. Set before the
+        # first render, so prefetching only starts once the view is complete
+        self.prefetch_layers = list(prefetch_layers or [])
+        self.prefetch_queue = []
+        self.prefetch_jobs = {}
+        self.prefetch_generation = 0
+        self.max_prefetch_jobs = 2
+        
+        # Spyglass: only the region around the lens is rendered, in its own job
+        self.lens_shape = lens_shape
+        self.lens_size = max(20, lens_size)
+        self.lens_magnification = max(1.0, lens_magnification)
+        self.lens_center = QPoint(canvas.width() // 2, canvas.height() // 2)
+        self.lens_image = None
+        self.lens_extent = None
+        self.lens_scale = None
+        self.lens_job = None
+        self.lens_generation = 0
+        
+        # Progressive quality: views that are not cached are first rendered at
+        # preview_ratio of the device pixel ratio and refined once the user has
+        # been idle for refine_delay_ms
+        self.preview_ratio = max(0.05, min(preview_ratio, 1.0))
+        self.refine_delay_ms = max(0, refine_delay_ms)
+        self.preview = False
+        self.rendering_preview = False
+        self.refine_targets = []
+        self.refine_images = {}
+        # Vector layer ids whose coarse swipe render is also simplified and unlabelled
+        self.simplified_layers = set(simplified_layers or [])
+        self.last_interaction = time.monotonic()
         
-        self.cached_image = None
+        # Difference mode: heatmap computed from the cached base and top images
+        # whenever they are swapped, with per column and row sums of the changed
+        # pixels in view so the swipe side figure follows the line for free
+        self.difference = False
+        self.difference_listener = None
+        self.heat_table = None
+        self.changed_columns = None
+        self.changed_rows = None
+        self.difference_scale = 1.0
+        self.refine_timer = QTimer()
+        self.cleaned_up = False
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.timeout.connect(self.refine)
         self.update_cache()
         self.show()
 
+    def map_settings(self, layers, background=None):
+        """Map settings of the canvas restricted to the given layers"""
+        settings = QgsMapSettings(self.canvas.mapSettings())
+        settings.setLayers(layers)
+        if background is None:
+            background = QColor(Qt.transparent)
+        settings.setBackgroundColor(background)
+        
+        # Render at the physical resolution of the screen the canvas is on
+        settings.setDevicePixelRatio(self.canvas.devicePixelRatioF())
+        settings.setOutputImageFormat(self.image_format(background))
+        return settings
+
+    def image_format(self, background):
+        """Opaque images need no alpha channel and are blitted without blending"""
+        if background.alpha() == 255:
+            return QImage.Format_RGB32
+        return QImage.Format_ARGB32_Premultiplied
+
+    def boundingRect(self):
+        """The overlay covers the whole canvas viewport"""
+        width, height = self.item_size
+        return QRectF(0, 0, width, height)
+
+    def update_item_size(self):
+        """Follow canvas resizes so the bounding rect stays correct"""
+        item_size = (self.canvas.width(), self.canvas.height())
+        if item_size != self.item_size:
+            self.prepareGeometryChange()
+            self.item_size = item_size
+
+    def view_changed(self):
+        """Show the cached images transformed to the new view until the sharp renders arrive"""
+        self.note_interaction()
+        self.update_item_size()
+        self.invalidate_cache()
+        self.cancel_prefetch()
+        self.update()
+
+    def cached_image_rect(self):
+        """Where the cached images lie in the current view, or None if they match it"""
+        if self.image_extent is None or self.canvas.rotation() != 0:
+            return None
+            
+        map_to_pixel = self.canvas.getCoordinateTransform()
+        top_left = map_to_pixel.transform(self.image_extent.xMinimum(), self.image_extent.yMaximum())
+        bottom_right = map_to_pixel.transform(self.image_extent.xMaximum(), self.image_extent.yMinimum())
+        rect = QRectF(top_left.x(), top_left.y(),
+                      bottom_right.x() - top_left.x(), bottom_right.y() - top_left.y())
+        
+        # Within half a pixel of the viewport - draw the images as they are
+        width, height = self.item_size
+        if (abs(rect.left()) < 0.5 and abs(rect.top()) < 0.5
+                and abs(rect.width() - width) < 0.5 and abs(rect.height() - height) < 0.5):
+            return None
+        return rect
+
+    def draw_cached_image(self, painter, image, image_rect, rect):
+        """Draw the part of a cached image that falls into rect (canvas pixels)"""
+        if image_rect is None:
+            # Source rect is in device pixels on HiDPI screens
+            ratio = image.devicePixelRatio()
+            source = QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+            painter.drawImage(rect, image, source)
+            return
+            
+        # Navigation preview: translate and scale the image into the new view
+        painter.save()
+        painter.setClipRect(rect)
+        painter.drawImage(image_rect, image, QRectF(image.rect()))
+        painter.restore()
+
+    def invalidate_cache(self):
+        """Cancel renders started for a previous view - the current images stay on screen"""
+        self.generation += 1
+        for job in self.render_jobs.values():
+            job.cancelWithoutBlocking()
+            metrics.count("render_jobs_cancelled")
+            # Keep a reference until the job reports it has finished
+            self.cancelled_jobs.append(job)
+        self.render_jobs = {}
+        self.pending_images = {}
+        self.shared_waits = {}
+        claims = self.claims
+        self.claims = {}
+        for key in claims.values():
+            # Overlays waiting for these tiles render them themselves
+            self.tile_cache.release(key)
+        self.refine_timer.stop()
+        self.refine_targets = []
+        self.refine_images = {}
+        self.rendering_preview = False
+
+    def tile_grid(self, settings):
+        """Tiles covering the view on a grid anchored at the map origin, or None for rotated maps"""
+        if settings.rotation() != 0:
+            return None
+            
+        tile_map_size = TILE_SIZE * settings.mapUnitsPerPixel()
+        extent = settings.visibleExtent()
+        first_col = math.floor(extent.xMinimum() / tile_map_size)
+        last_col = math.ceil(extent.xMaximum() / tile_map_size) - 1
+        first_row = math.floor(extent.yMinimum() / tile_map_size)
+        last_row = math.ceil(extent.yMaximum() / tile_map_size) - 1
+        
+        covering_extent = QgsRectangle(first_col * tile_map_size, first_row * tile_map_size,
+                                       (last_col + 1) * tile_map_size, (last_row + 1) * tile_map_size)
+        size = QSize((last_col - first_col + 1) * TILE_SIZE, (last_row - first_row + 1) * TILE_SIZE)
+        
+        tiles = []
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                # Map rows grow upwards, image rows downwards
+                rect = QRect((col - first_col) * TILE_SIZE, (last_row - row) * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+                tiles.append((col, row, rect))
+        return covering_extent, size, tiles
+
+    def cached_render(self, settings, size, tile_keys):
+        """Assemble an image from cached tiles, or None if any tile is missing"""
+        # The entries keep the memory maps of disk cached tiles alive even if
+        # loading later tiles evicts earlier ones from the cache
+        tiles = []
+        for key, rect in tile_keys:
+            entry = self.tile_cache.get(key)
+            if entry is None:
+                return None
+            tiles.append((entry[0], rect, entry))
+            
+        ratio = settings.devicePixelRatio()
+        image = QImage(size * ratio, settings.outputImageFormat())
+        image.setDevicePixelRatio(ratio)
+        image.fill(Qt.transparent)
+        # Painter coordinates are in logical pixels, like the tile rects
+        painter = QPainter(image)
+        for tile, rect, _ in tiles:
+            painter.drawImage(rect.topLeft(), tile)
+        painter.end()
+        return image
+
+    def render_mode(self, swipe_direction):
+        """Which images a direction needs: split, quad or lens"""
+        if swipe_direction in ["quad", "lens"]:
+            return swipe_direction
+        return "split"
+
+    def render_targets(self):
+        """Images to render as (name, layers, background)"""
+        if self.swipe_direction == "quad":
+            swiped_layers = self.layers[:QUAD_PANES]
+        else:
+            swiped_layers = self.layers
+            
+        swiped_ids = {layer.id() for layer in swiped_layers + self.excluded_layers}
+        base_layers = [layer for layer in self.canvas.layers() if layer.id() not in swiped_ids]
+        targets = [("base", base_layers, self.canvas.canvasColor())]
+        
+        if self.swipe_direction == "quad":
+            # One render job per pane, so the panes render in parallel
+            for index, layer in enumerate(swiped_layers):
+                targets.append((f"pane{index}", [layer], QColor(Qt.transparent)))
+        elif self.swipe_direction != "lens":
+            # In lens mode the swiped layers are rendered for the lens region only
+            targets.append(("top", swiped_layers, QColor(Qt.transparent)))
+        return targets
+
+    @metrics.timed("update_cache")
     def update_cache(self):
+        """Serve the overlay images from the tile cache, rendering missing ones in the background"""
+        self.update_item_size()
+        self.invalidate_cache()
         try:
-            self.cached_image = self.canvas.grab().toImage()
+            targets = self.render_targets()
+            for _, layers, _ in targets:
+                self.tile_cache.watch_layers(layers)
+            
+            view_settings = self.canvas.mapSettings()
+            grid = self.tile_grid(view_settings)
+            if grid:
+                self.pending_extent = grid[0]
+            else:
+                self.pending_extent = view_settings.visibleExtent()
+            
+            missing = []
+            for name, layers, background in targets:
+                settings = self.map_settings(layers, background)
+                simplify = self.simplify_target(name, layers)
+                if not grid:
+                    missing.append((name, settings, None, simplify))
+                    continue
+                    
+                covering_extent, size, tiles = grid
+                tile_keys = [(self.tile_cache.tile_key(layers, settings, background, col, row), rect)
+                             for col, row, rect in tiles]
+                image = self.cached_render(settings, size, tile_keys)
+                if image is not None:
+                    self.pending_images[name] = image
+                    continue
+                    
+                # Render the whole tile-aligned extent in one job and split it afterwards
+                settings.setOutputSize(size)
+                settings.setExtent(covering_extent)
+                missing.append((name, settings, tile_keys, simplify))
+                
+            if any(self.preview_ratio < 1.0 or simplify for _, _, _, simplify in missing):
+                # Coarse images first, the full fidelity renders wait for idle time
+                self.refine_images = dict(self.pending_images)
+                self.rendering_preview = True
+                for name, settings, tile_keys, simplify in missing:
+                    if self.preview_ratio < 1.0 or simplify:
+                        self.refine_targets.append((name, settings, tile_keys))
+                        self.start_render_job(name, self.preview_settings(settings, simplify))
+                    else:
+                        # Nothing to gain from a coarse pass - render it sharp right away
+                        self.start_render_job(name, settings, tile_keys)
+            else:
+                for name, settings, tile_keys, _ in missing:
+                    self.start_render_job(name, settings, tile_keys)
+                
+            if not self.renders_pending():
+                self.swap_images()
+            self.update_lens(force=True)
         except Exception as e:
-            self.cached_image = None
+            self.invalidate_cache()
 
+    def preview_settings(self, settings, simplify=False):
+        """Same extent at a fraction of the device pixel ratio
+        
+        Fewer pixels means raster providers read from their overviews
+        (pyramids) and the renderers take their preview shortcuts. With
+        simplify, vector geometries are simplified and labels skipped.
+        """
+        preview = QgsMapSettings(settings)
+        preview.setDevicePixelRatio(settings.devicePixelRatio() * self.preview_ratio)
+        preview.setFlag(QgsMapSettings.RenderPreviewJob, True)
+        if simplify:
+            method = QgsVectorSimplifyMethod()
+            method.setSimplifyHints(QgsVectorSimplifyMethod.GeometrySimplification)
+            method.setThreshold(INTERACTION_SIMPLIFY_THRESHOLD)
+            # Let providers that can simplify on their side (e.g. PostGIS) do so
+            method.setForceLocalOptimization(False)
+            preview.setSimplifyMethod(method)
+            preview.setFlag(QgsMapSettings.DrawLabeling, False)
+        return preview
+        
+    def simplify_target(self, name, layers):
+        """Whether the coarse render of a swipe image is simplified"""
+        return name != "base" and any(layer.id() in self.simplified_layers for layer in layers)
+        
+    def set_simplified_layers(self, layer_ids):
+        """Takes effect on the next render of an uncached view"""
+        self.simplified_layers = set(layer_ids)
+
+    def release_job(self, job):
+        """Forget a finished job and let Qt delete it after its signal
+        
+        The finished slot holds a reference to the job, so without this
+        every job and its rendered image would be kept alive by that cycle.
+        """
+        if job in self.cancelled_jobs:
+            self.cancelled_jobs.remove(job)
+        job.deleteLater()
+
+    def renders_pending(self):
+        return bool(self.render_jobs or self.shared_waits)
+
+    def start_render_job(self, name, settings, tile_keys=None):
+        if tile_keys:
+            first_key = tile_keys[0][0]
+            if not self.tile_cache.claim(first_key):
+                # Another canvas with the same view renders exactly these tiles
+                self.shared_waits[name] = first_key
+                self.tile_cache.wait_for(first_key, partial(self.shared_render_ready, name, settings, tile_keys, self.generation))
+                metrics.count("render_jobs_shared")
+                return
+            self.claims[name] = first_key
+        job = QgsMapRendererParallelJob(settings)
+        job.finished.connect(partial(self.render_job_finished, job, name, self.generation, tile_keys))
+        self.render_jobs[name] = job
+        metrics.count("render_jobs_started")
+        job.start()
+
+    def render_job_finished(self, job, name, generation, tile_keys=None):
+        self.release_job(job)
+        if generation != self.generation or self.render_jobs.get(name) is not job:
+            # Stale render from a view the user has already left
+            return
+            
+        del self.render_jobs[name]
+        image = job.renderedImage()
+        self.pending_images[name] = image
+        
+        if self.rendering_preview and name not in {target[0] for target in self.refine_targets}:
+            # Rendered sharp during the coarse pass - nothing to refine, with
+            # or without a tile grid (rotated maps have none)
+            self.refine_images[name] = image
+        if tile_keys:
+            # Only the swiped layers go to disk, the base follows the whole project
+            self.store_tiles(image, tile_keys, persist=name != "base")
+            key = self.claims.pop(name, None)
+            if key is not None:
+                self.tile_cache.release(key)
+        
+        # Swap all images together so base and swiped layers always match
+        if not self.renders_pending():
+            self.swap_images()
+            
+    def shared_render_ready(self, name, settings, tile_keys, generation):
+        """The render this overlay waited for has finished or was given up"""
+        if generation != self.generation or name not in self.shared_waits:
+            return
+        del self.shared_waits[name]
+        image = self.cached_render(settings, settings.outputSize(), tile_keys)
+        if image is None:
+            # Cancelled, or its tiles were already evicted - render them here
+            self.start_render_job(name, settings, tile_keys)
+            return
+            
+        self.pending_images[name] = image
+        if self.rendering_preview:
+            self.refine_images[name] = image
+        if not self.renders_pending():
+            self.swap_images()
+
+    def store_tiles(self, image, tile_keys, persist=False):
+        """Split a tile-aligned render into the tile cache, and with persist into the disk cache"""
+        ratio = image.devicePixelRatio()
+        for key, rect in tile_keys:
+            device_rect = QRect(round(rect.x() * ratio), round(rect.y() * ratio),
+                                round(rect.width() * ratio), round(rect.height() * ratio))
+            tile = image.copy(device_rect)
+            self.tile_cache.put(key, tile)
+            if persist:
+                self.tile_cache.persist(key, tile)
+
+    def swap_images(self):
+        self.images = self.pending_images
+        self.image_extent = self.pending_extent
+        self.pending_images = {}
+        self.preview = self.rendering_preview
+        self.rendering_preview = False
+        self.update_difference()
+        self.tile_cache.hold_images(self, list(self.images.values()))
+        self.update()
+        
+        if self.preview:
+            self.schedule_refine()
+            return
+        # The current view is complete - use the idle time to render ahead
+        self.start_prefetch()
+        
+    def set_progressive(self, preview_ratio, refine_delay_ms):
+        """Preview resolution as a fraction of the device pixel ratio (1.0 disables) and idle delay"""
+        self.preview_ratio = max(0.05, min(preview_ratio, 1.0))
+        self.refine_delay_ms = max(0, refine_delay_ms)
+        
+    def note_interaction(self):
+        """Postpone the full resolution renders while the user is interacting"""
+        self.last_interaction = time.monotonic()
+        
+    def schedule_refine(self):
+        idle_ms = (time.monotonic() - self.last_interaction) * 1000.0
+        self.refine_timer.start(max(0, int(self.refine_delay_ms - idle_ms)))
+        
+    def refine(self):
+        """Replace the coarse images with full resolution renders"""
+        if not self.preview or not self.refine_targets:
+            return
+        idle_ms = (time.monotonic() - self.last_interaction) * 1000.0
+        if idle_ms < self.refine_delay_ms:
+            self.schedule_refine()
+            return
+            
+        # Images that were served from the tile cache are already sharp
+        self.pending_images = self.refine_images
+        self.refine_images = {}
+        targets = self.refine_targets
+        self.refine_targets = []
+        for name, settings, tile_keys in targets:
+            self.start_render_job(name, settings, tile_keys)
+
+    def set_layers(self, layers, prefetch_layers=None):
+        """Swipe other layers; served instantly if they were prefetched"""
+        self.layers = list(layers)
+        if prefetch_layers is not None:
+            self.prefetch_layers = list(prefetch_layers)
+        self.update_cache()
+
+    def set_prefetch_layers(self, prefetch_layers):
+        """Swipe targets (lists of layers) to render ahead for the current view"""
+        self.prefetch_layers = list(prefetch_layers)
+        self.start_prefetch()
+
+    def start_prefetch(self):
+        """Queue renders of the prefetch targets that are not cached yet"""
+        self.prefetch_queue = []
+        if not self.prefetch_layers or self.swipe_direction == "quad":
+            return
+        grid = self.tile_grid(self.canvas.mapSettings())
+        if not grid:
+            return
+            
+        covering_extent, size, tiles = grid
+        background = QColor(Qt.transparent)
+        for layers in self.prefetch_layers:
+            settings = self.map_settings(layers, background)
+            tile_keys = [(self.tile_cache.tile_key(layers, settings, background, col, row), rect)
+                         for col, row, rect in tiles]
+            first_key = tile_keys[0][0]
+            if first_key in self.prefetch_jobs or all(self.tile_cache.stored(key) for key, _ in tile_keys):
+                continue
+            self.tile_cache.watch_layers(layers)
+            settings.setOutputSize(size)
+            settings.setExtent(covering_extent)
+            self.prefetch_queue.append((first_key, settings, tile_keys))
+        self.run_prefetch_queue()
+
+    def run_prefetch_queue(self):
+        while self.prefetch_queue and len(self.prefetch_jobs) < self.max_prefetch_jobs:
+            first_key, settings, tile_keys = self.prefetch_queue.pop(0)
+            job = QgsMapRendererParallelJob(settings)
+            job.finished.connect(partial(self.prefetch_job_finished, job, first_key, self.prefetch_generation, tile_keys))
+            self.prefetch_jobs[first_key] = job
+            metrics.count("render_jobs_started")
+            job.start()
+
+    def prefetch_job_finished(self, job, first_key, generation, tile_keys):
+        self.release_job(job)
+        if generation != self.prefetch_generation or self.prefetch_jobs.get(first_key) is not job:
+            return
+            
+        del self.prefetch_jobs[first_key]
+        self.store_tiles(job.renderedImage(), tile_keys, persist=True)
+        self.run_prefetch_queue()
+
+    def cancel_prefetch(self):
+        """Prefetched renders only help for the view they were started for"""
+        self.prefetch_generation += 1
+        for job in self.prefetch_jobs.values():
+            job.cancelWithoutBlocking()
+            metrics.count("render_jobs_cancelled")
+            self.cancelled_jobs.append(job)
+        self.prefetch_jobs = {}
+        self.prefetch_queue = []
+
+    def set_difference(self, enabled):
+        """Show the change heatmap instead of the swiped layer"""
+        self.difference = enabled
+        self.update_difference()
+        self.tile_cache.hold_images(self, list(self.images.values()))
+        self.update()
+        
+    def image_array(self, image):
+        """Zero-copy (height, width, 4) view of the pixels of a 32-bit image"""
+        pointer = image.constBits()
+        pointer.setsize(image.bytesPerLine() * image.height())
+        rows = numpy.frombuffer(pointer, numpy.uint8).reshape(image.height(), image.bytesPerLine())
+        return rows[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
+        
+    def heat_colors(self):
+        """Premultiplied ARGB colour per change magnitude, transparent up to the threshold"""
+        if self.heat_table is None:
+            levels = numpy.arange(256)
+            ramp = numpy.clip((levels - DIFFERENCE_THRESHOLD) / (255.0 - DIFFERENCE_THRESHOLD), 0.0, 1.0)
+            # Yellow for small changes to red for large ones
+            alpha = 200
+            red = numpy.full(256, 255 * alpha // 255, dtype=numpy.uint32)
+            green = (255 * (1.0 - ramp) * alpha / 255).astype(numpy.uint32)
+            table = (alpha << 24) | (red << 16) | (green << 8)
+            table[levels <= DIFFERENCE_THRESHOLD] = 0
+            self.heat_table = table.astype(numpy.uint32)
+        return self.heat_table
+        
+    @metrics.timed("update_difference")
+    def update_difference(self):
+        """Recompute the heatmap and change statistics from the cached images"""
+        self.images.pop("difference", None)
+        self.changed_columns = None
+        self.changed_rows = None
+        base = self.images.get("base")
+        top = self.images.get("top")
+        if not self.difference or numpy is None or base is None or top is None:
+            return
+            
+        if top.size() != base.size():
+            # One of them is a coarse preview
+            top = top.scaled(base.size())
+        if base.depth() != 32:
+            base = base.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        if top.format() != QImage.Format_ARGB32_Premultiplied:
+            top = top.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+            
+        # Composite minus base, per channel: top - base * top alpha
+        base_pixels = self.image_array(base)
+        top_pixels = self.image_array(top)
+        alpha = top_pixels[..., 3:4].astype(numpy.int32)
+        change = numpy.abs(top_pixels[..., :3].astype(numpy.int32) - (base_pixels[..., :3] * alpha + 127) // 255)
+        magnitude = change.max(axis=2).astype(numpy.uint8)
+        
+        heat = numpy.ascontiguousarray(self.heat_colors()[magnitude])
+        height, width = magnitude.shape
+        heatmap = QImage(heat.data, width, height, width * 4, QImage.Format_ARGB32_Premultiplied).copy()
+        heatmap.setDevicePixelRatio(base.devicePixelRatio())
+        self.images["difference"] = heatmap
+        
+        # Statistics over the part of the images that is in view
+        changed = magnitude > DIFFERENCE_THRESHOLD
+        image_rect = self.cached_image_rect()
+        self.difference_scale = base.devicePixelRatio()
+        if image_rect is not None and image_rect.width() > 0:
+            self.difference_scale = width / image_rect.width()
+            view_width, view_height = self.item_size
+            left = max(0, int(round(-image_rect.left() * self.difference_scale)))
+            top_row = max(0, int(round(-image_rect.top() * self.difference_scale)))
+            changed = changed[top_row:top_row + int(round(view_height * self.difference_scale)),
+                              left:left + int(round(view_width * self.difference_scale))]
+        if changed.size == 0:
+            return
+        self.changed_columns = numpy.concatenate(([0], numpy.cumsum(changed.sum(axis=0))))
+        self.changed_rows = numpy.concatenate(([0], numpy.cumsum(changed.sum(axis=1))))
+        self.report_difference()
+        
+    def difference_stats(self):
+        """Fraction of changed pixels in view and on the swipe side, or None"""
+        if self.changed_columns is None or self.swipe_direction not in ["right", "left", "top", "bottom"]:
+            return None
+        columns = len(self.changed_columns) - 1
+        rows = len(self.changed_rows) - 1
+        changed = self.changed_columns[-1]
+        total = changed / float(columns * rows)
+        
+        if self.swipe_direction in ["right", "left"]:
+            cut = max(0, min(int(round(self.split_position * self.difference_scale)), columns))
+            before, before_area = self.changed_columns[cut], cut * rows
+        else:
+            cut = max(0, min(int(round(self.split_position * self.difference_scale)), rows))
+            before, before_area = self.changed_rows[cut], cut * columns
+        after, after_area = changed - before, columns * rows - before_area
+        
+        # The swiped layer is right of, left of, above or below the line
+        if self.swipe_direction in ["right", "bottom"]:
+            swipe_side = after / float(after_area) if after_area else 0.0
+        else:
+            swipe_side = before / float(before_area) if before_area else 0.0
+        return float(total), float(swipe_side)
+        
+    def report_difference(self):
+        stats = self.difference_stats()
+        if stats is not None and self.difference_listener:
+            self.difference_listener(stats)
+        
     def set_line_style(self, color, width):
         """Set line style"""
         self.line_color = color
         self.line_width = width
         self.update()
-        self.canvas.refresh()
+        
+    @metrics.timed("set_layer_opacity")
+    def set_layer_opacity(self, opacity):
+        """Set opacity of the swiped layer in the hidden area"""
+        self.layer_opacity = opacity
+        self.update()
         
     def set_direction(self, swipe_direction):
         """Change overlay direction"""
+        # Quad and lens modes need other images than a single swipe image
+        renders_changed = self.render_mode(swipe_direction) != self.render_mode(self.swipe_direction)
         self.swipe_direction = swipe_direction
-        if swipe_direction in ["right", "left"]:
+        if swipe_direction in ["right", "left", "quad"]:
             self.split_position = self.canvas.width() // 2
         else:  # top, bottom
             self.split_position = self.canvas.height() // 2
+        self.split_position_y = self.canvas.height() // 2
+        
+        if renders_changed:
+            self.update_cache()
         self.update()
-        self.canvas.refresh()
 
+    def move_split_to(self, point):
+        """Move the line (or the quad intersection, or the lens) to a canvas point"""
+        if self.swipe_direction == "lens":
+            self.set_lens_center(point)
+        elif self.swipe_direction == "quad":
+            self.set_split_point(point.x(), point.y())
+        elif self.swipe_direction in ["right", "left"]:
+            self.set_split_position(point.x())
+        else:  # top, bottom
+            self.set_split_position(point.y())
+
+    @metrics.timed("set_split_point")
+    def set_split_point(self, x, y):
+        """Move the intersection of the quad split"""
+        self.note_interaction()
+        self.previous_position = self.split_position
+        self.previous_position_y = self.split_position_y
+        self.split_position = max(0, min(x, self.canvas.width()))
+        self.split_position_y = max(0, min(y, self.canvas.height()))
+        
+        # Only the vertical and horizontal bands swept by the two lines changed
+        margin = self.line_width / 2.0 + 2
+        if self.split_position != self.previous_position:
+            start = min(self.previous_position, self.split_position) - margin
+            end = max(self.previous_position, self.split_position) + margin
+            self.update(QRectF(start, 0, end - start, self.canvas.height()))
+        if self.split_position_y != self.previous_position_y:
+            start = min(self.previous_position_y, self.split_position_y) - margin
+            end = max(self.previous_position_y, self.split_position_y) + margin
+            self.update(QRectF(0, start, self.canvas.width(), end - start))
+
+    def set_lens(self, shape, size, magnification):
+        """Set lens shape (circle or rect), size in pixels and magnification"""
+        self.update(self.lens_rect())
+        self.lens_shape = shape
+        self.lens_size = max(20, size)
+        self.lens_magnification = max(1.0, magnification)
+        if self.swipe_direction == "lens":
+            self.update_lens(force=True)
+        self.update(self.lens_rect())
+
+    def lens_rect(self, center=None):
+        """Canvas rect covered by the lens, including its outline"""
+        if center is None:
+            center = self.lens_center
+        half = self.lens_size / 2.0 + self.line_width + 2
+        return QRectF(center.x() - half, center.y() - half, 2 * half, 2 * half)
+
+    def visible_swiped_layers(self, pos):
+        """Swiped layers shown at a canvas position - the rest of the map is the base"""
+        if self.swipe_direction == "quad":
+            x, y = self.split_position, self.split_position_y
+            pane = (0 if pos.y() < y else 2) + (0 if pos.x() < x else 1)
+            return self.layers[pane:pane + 1]
+        if self.swipe_direction == "lens":
+            return list(self.layers) if self.lens_rect().contains(QPointF(pos)) else []
+        visible_rect, _ = swipe_rects(self.swipe_direction, self.split_position, self.canvas.width(), self.canvas.height())
+        return list(self.layers) if visible_rect.contains(QPointF(pos)) else []
+
+    @metrics.timed("set_lens_center")
+    def set_lens_center(self, point):
+        """Move the lens, repainting only its old and new area"""
+        if point == self.lens_center:
+            return
+        old_rect = self.lens_rect()
+        self.lens_center = QPoint(point)
+        self.update(old_rect)
+        self.update(self.lens_rect())
+        self.update_lens()
+
+    def lens_covered(self):
+        """Whether the last lens render still covers the lens at its current position"""
+        if self.lens_image is None or self.lens_scale != self.canvas.mapUnitsPerPixel():
+            return False
+        center = self.canvas.getCoordinateTransform().toMapCoordinates(self.lens_center.x(), self.lens_center.y())
+        # Half the map width shown in the lens
+        half = self.lens_size / 2.0 * self.canvas.mapUnitsPerPixel() / self.lens_magnification
+        return (center.x() - half >= self.lens_extent.xMinimum() and center.x() + half <= self.lens_extent.xMaximum()
+                and center.y() - half >= self.lens_extent.yMinimum() and center.y() + half <= self.lens_extent.yMaximum())
+
+    def update_lens(self, force=False):
+        """Render the swiped layers around the lens if the last render no longer covers it"""
+        if self.swipe_direction != "lens" or not self.layers:
+            return
+        if not force and (self.lens_covered() or self.lens_job is not None):
+            # A running job is never cancelled by a move: it finishes and is
+            # replaced right away if the lens has left it meanwhile
+            return
+            
+        self.cancel_lens()
+        view_settings = self.canvas.mapSettings()
+        center = view_settings.mapToPixel().toMapCoordinates(self.lens_center.x(), self.lens_center.y())
+        region = int(self.lens_size * LENS_MARGIN)
+        half = region / 2.0 * view_settings.mapUnitsPerPixel() / self.lens_magnification
+        
+        settings = self.map_settings(self.layers, QColor(Qt.transparent))
+        settings.setOutputSize(QSize(region, region))
+        settings.setExtent(QgsRectangle(center.x() - half, center.y() - half, center.x() + half, center.y() + half))
+        
+        job = QgsMapRendererParallelJob(settings)
+        job.finished.connect(partial(self.lens_job_finished, job, self.lens_generation, view_settings.mapUnitsPerPixel()))
+        self.lens_job = job
+        metrics.count("render_jobs_started")
+        job.start()
+
+    def lens_job_finished(self, job, generation, scale):
+        self.release_job(job)
+        if generation != self.lens_generation or job is not self.lens_job:
+            return
+            
+        self.lens_job = None
+        self.lens_image = job.renderedImage()
+        self.lens_extent = job.mapSettings().visibleExtent()
+        self.lens_scale = scale
+        self.update(self.lens_rect())
+        
+        # The cursor may have left the rendered region while this job was running
+        self.update_lens()
+
+    def cancel_lens(self):
+        self.lens_generation += 1
+        if self.lens_job is not None:
+            self.lens_job.cancelWithoutBlocking()
+            metrics.count("render_jobs_cancelled")
+            self.cancelled_jobs.append(self.lens_job)
+            self.lens_job = None
+
+    def draw_lens(self, painter, dirty_rect):
+        """Draw the swiped layers inside the lens, magnified around the cursor"""
+        lens_rect = self.lens_rect().adjusted(self.line_width + 2, self.line_width + 2,
+                                              -self.line_width - 2, -self.line_width - 2)
+        path = QPainterPath()
+        if self.lens_shape == "rect":
+            path.addRect(lens_rect)
+        else:
+            path.addEllipse(lens_rect)
+            
+        if self.lens_image is not None and lens_rect.intersects(dirty_rect):
+            painter.save()
+            painter.setClipRect(dirty_rect)
+            painter.setClipPath(path, Qt.IntersectClip)
+            
+            # Place the image so the map point under the cursor lies at the lens center
+            center = self.canvas.getCoordinateTransform().toMapCoordinates(self.lens_center.x(), self.lens_center.y())
+            image_width = self.lens_image.width() / self.lens_image.devicePixelRatio()
+            image_scale = self.lens_extent.width() / image_width
+            offset_x = (center.x() - self.lens_extent.xMinimum()) / image_scale
+            offset_y = (self.lens_extent.yMaximum() - center.y()) / image_scale
+            painter.drawImage(QPointF(self.lens_center.x() - offset_x, self.lens_center.y() - offset_y), self.lens_image)
+            painter.restore()
+            
+        # Draw the lens outline
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(path)
+
+    @metrics.timed("set_split_position")
     def set_split_position(self, pos):
+        self.note_interaction()
+        self.previous_position = self.split_position
         if self.swipe_direction in ["right", "left"]:
             self.split_position = max(0, min(pos, self.canvas.width()))
         else:  # top, bottom
             self.split_position = max(0, min(pos, self.canvas.height()))
-        self.update()
-        self.canvas.refresh()
+            
+        if self.split_position != self.previous_position:
+            self.update(self.dirty_strip())
 
+    def dirty_strip(self):
+        """Band between the previous and current line position, including the line width"""
+        margin = self.line_width / 2.0 + 2
+        start = min(self.previous_position, self.split_position) - margin
+        end = max(self.previous_position, self.split_position) + margin
+        
+        if self.swipe_direction in ["right", "left"]:
+            return QRectF(start, 0, end - start, self.canvas.height())
+        else:  # top, bottom
+            return QRectF(0, start, self.canvas.width(), end - start)
+
+    def draw_swipe_layer(self, painter, image_rect, dirty_rect, visible_rect, hidden_rect):
+        """Draw the swiped layer: full opacity on the visible side, configured opacity on the hidden side"""
+        top_image = self.images.get("difference" if self.difference else "top")
+        if top_image is None:
+            return
+            
+        visible_rect = visible_rect.intersected(dirty_rect)
+        if not visible_rect.isEmpty():
+            self.draw_cached_image(painter, top_image, image_rect, visible_rect)
+        
+        hidden_rect = hidden_rect.intersected(dirty_rect)
+        if self.layer_opacity > 0 and not hidden_rect.isEmpty():
+            painter.setOpacity(self.layer_opacity)
+            self.draw_cached_image(painter, top_image, image_rect, hidden_rect)
+            painter.setOpacity(1.0)
+
+    def draw_panes(self, painter, image_rect, dirty_rect, width, height):
+        """Draw each quad pane from its own cached image"""
+        x = self.split_position
+        y = self.split_position_y
+        pane_rects = [
+            QRectF(0, 0, x, y),                   # top left
+            QRectF(x, 0, width - x, y),           # top right
+            QRectF(0, y, x, height - y),          # bottom left
+            QRectF(x, y, width - x, height - y),  # bottom right
+        ]
+        for index, pane_rect in enumerate(pane_rects):
+            image = self.images.get(f"pane{index}")
+            rect = pane_rect.intersected(dirty_rect)
+            if image is not None and not rect.isEmpty():
+                self.draw_cached_image(painter, image, image_rect, rect)
+
+    @metrics.timed("paint")
     def paint(self, painter, option, widget=None):
-        if not self.cached_image:
+        if "base" not in self.images:
             return
 
         painter.save()
@@ -477,45 +2328,45 @@ class SplitSwipeOverlay(QgsMapCanvasItem):
             pen.setWidth(self.line_width)
             painter.setPen(pen)
             
-            if self.swipe_direction == "right":
-                # Swipe from right: left of line shows base layer, right shows selected layer
-                clip_rect = QRectF(0, 0, self.split_position, self.canvas.height())
-                painter.setClipRect(clip_rect)
-                painter.drawImage(0, 0, self.cached_image)
+            width = self.canvas.width()
+            height = self.canvas.height()
+            
+            # Only redraw the part of the overlay that was invalidated
+            dirty_rect = QRectF(0, 0, width, height)
+            if option is not None and not option.exposedRect.isEmpty():
+                dirty_rect = option.exposedRect.intersected(dirty_rect)
+            
+            # Cached images are transformed while the view differs from the rendered one
+            image_rect = self.cached_image_rect()
+            
+            # Base layers are shown everywhere, the swiped layer is composited on top
+            self.draw_cached_image(painter, self.images["base"], image_rect, dirty_rect)
+            
+            if self.swipe_direction in ["right", "left"]:
+                visible_rect, hidden_rect = swipe_rects(self.swipe_direction, self.split_position, width, height)
+                self.draw_swipe_layer(painter, image_rect, dirty_rect, visible_rect, hidden_rect)
                 
                 # Draw separator line
-                painter.setClipping(False)
-                painter.drawLine(self.split_position, 0, self.split_position, self.canvas.height())
+                painter.drawLine(self.split_position, 0, self.split_position, height)
                 
-            elif self.swipe_direction == "left":
-                # Swipe from left: right of line shows base layer, left shows selected layer
-                clip_rect = QRectF(self.split_position, 0, self.canvas.width() - self.split_position, self.canvas.height())
-                painter.setClipRect(clip_rect)
-                painter.drawImage(0, 0, self.cached_image)
+            elif self.swipe_direction in ["top", "bottom"]:
+                visible_rect, hidden_rect = swipe_rects(self.swipe_direction, self.split_position, width, height)
+                self.draw_swipe_layer(painter, image_rect, dirty_rect, visible_rect, hidden_rect)
                 
                 # Draw separator line
-                painter.setClipping(False)
-                painter.drawLine(self.split_position, 0, self.split_position, self.canvas.height())
+                painter.drawLine(0, self.split_position, width, self.split_position)
                 
-            elif self.swipe_direction == "top":
-                # Swipe from top: below line shows base layer, above shows selected layer
-                clip_rect = QRectF(0, self.split_position, self.canvas.width(), self.canvas.height() - self.split_position)
-                painter.setClipRect(clip_rect)
-                painter.drawImage(0, 0, self.cached_image)
+            elif self.swipe_direction == "quad":
+                # Cross split: one layer per pane around the intersection point
+                self.draw_panes(painter, image_rect, dirty_rect, width, height)
                 
-                # Draw separator line
-                painter.setClipping(False)
-                painter.drawLine(0, self.split_position, self.canvas.width(), self.split_position)
+                # Draw both separator lines
+                painter.drawLine(self.split_position, 0, self.split_position, height)
+                painter.drawLine(0, self.split_position_y, width, self.split_position_y)
                 
-            elif self.swipe_direction == "bottom":
-                # Swipe from bottom: above line shows base layer, below shows selected layer
-                clip_rect = QRectF(0, 0, self.canvas.width(), self.split_position)
-                painter.setClipRect(clip_rect)
-                painter.drawImage(0, 0, self.cached_image)
-                
-                # Draw separator line
-                painter.setClipping(False)
-                painter.drawLine(0, self.split_position, self.canvas.width(), self.split_position)
+            elif self.swipe_direction == "lens":
+                # Spyglass: base layers everywhere, swiped layers inside the lens
+                self.draw_lens(painter, dirty_rect)
             
         except Exception as e:
             pass
@@ -523,22 +2374,322 @@ class SplitSwipeOverlay(QgsMapCanvasItem):
             painter.restore()
 
     def cleanup(self):
+        """Cancel renders, disconnect from the canvas and leave the scene - safe to call twice"""
+        if self.cleaned_up:
+            return
+        self.cleaned_up = True
+        self.invalidate_cache()
+        self.cancel_prefetch()
+        self.cancel_lens()
+        self.refine_timer.stop()
+        self.difference_listener = None
+        self.images = {}
+        self.tile_cache.hold_images(self, [])
         try:
-            self.canvas.extentsChanged.disconnect(self.update_cache)
-            self.canvas.scaleChanged.disconnect(self.update_cache)
-            # Remove from scene
-            if self.canvas.scene():
-                self.canvas.scene().removeItem(self)
-        except:
+            self.canvas.extentsChanged.disconnect(self.view_changed)
+            self.canvas.scaleChanged.disconnect(self.view_changed)
+            self.canvas.mapCanvasRefreshed.disconnect(self.update_cache)
+        except (RuntimeError, TypeError):
+            # The canvas is already deleted
             pass
+        scene = self.scene()
+        if scene:
+            scene.removeItem(self)
+            # A removed item is no longer owned by the scene - Python deletes it
+            sip.transferback(self)
+
+class SwipeIdentifyIndex:
+    """Spatial indexes of vector layers in and around the view, for side-aware identify
+    
+    Built in a background thread from a feature source snapshot, and only
+    rebuilt when the view leaves the indexed extent, the CRS changes or the
+    layer data changes - so identifying is an index lookup, not a scan.
+    """
+    def __init__(self, canvas):
+        self.canvas = canvas
+        # Layer id -> (future of the index, indexed extent, destination CRS)
+        self.entries = {}
+        self.watched_layers = {}
+        self.builder = ThreadPoolExecutor(max_workers=1)
+        
+    def destination_crs(self):
+        return self.canvas.mapSettings().destinationCrs()
+        
+    def valid(self, layer):
+        entry = self.entries.get(layer.id())
+        if entry is None:
+            return False
+        _, extent, crs = entry
+        return crs == self.destination_crs() and extent.contains(self.canvas.extent())
+        
+    def prepare(self, layers):
+        """Start building the indexes the current view is not covered by"""
+        for layer in layers:
+            if isinstance(layer, QgsVectorLayer) and not self.valid(layer):
+                self.build(layer)
+                
+    def build(self, layer):
+        extent = QgsRectangle(self.canvas.extent())
+        extent.scale(IDENTIFY_INDEX_MARGIN)
+        crs = self.destination_crs()
+        transform = QgsCoordinateTransform(crs, layer.crs(), QgsProject.instance())
+        try:
+            layer_extent = transform.transformBoundingBox(extent)
+        except QgsCsException:
+            layer_extent = layer.extent()
+            
+        request = QgsFeatureRequest().setFilterRect(layer_extent).setNoAttributes()
+        # The source is a snapshot that may be read from another thread
+        source = QgsVectorLayerFeatureSource(layer)
+        future = self.builder.submit(self.build_index, source, request)
+        self.entries[layer.id()] = (future, extent, crs)
+        metrics.count("identify_index_builds")
+        
+        if layer.id() not in self.watched_layers:
+            slot = partial(self.invalidate, layer.id())
+            layer.dataChanged.connect(slot)
+            self.watched_layers[layer.id()] = (layer, slot)
+            
+    def build_index(self, source, request):
+        return QgsSpatialIndex(source.getFeatures(request), None, QgsSpatialIndex.FlagStoreFeatureGeometries)
+        
+    def feature_ids_at(self, layer, point, tolerance):
+        """Ids of the features of a vector layer within tolerance of a point (canvas CRS)"""
+        if not self.valid(layer):
+            self.build(layer)
+        # Only waits if the index is still being built
+        try:
+            index = self.entries[layer.id()][0].result()
+        except Exception:
+            # Rebuilt on the next identify, e.g. once the data source is back
+            self.invalidate(layer.id())
+            raise
+        
+        rect = QgsRectangle(point.x() - tolerance, point.y() - tolerance, point.x() + tolerance, point.y() + tolerance)
+        transform = QgsCoordinateTransform(self.destination_crs(), layer.crs(), QgsProject.instance())
+        try:
+            rect = transform.transformBoundingBox(rect)
+        except QgsCsException:
+            return []
+        search = QgsGeometry.fromRect(rect)
+        return [fid for fid in index.intersects(rect) if index.geometry(fid).intersects(search)]
+        
+    def invalidate(self, layer_id):
+        self.entries.pop(layer_id, None)
+        
+    def release(self):
+        for layer, slot in self.watched_layers.values():
+            try:
+                layer.dataChanged.disconnect(slot)
+            except (RuntimeError, TypeError):
+                pass
+        self.watched_layers = {}
+        self.entries = {}
+        self.builder.shutdown(wait=False)
+
+class SwipeAnimationExport:
+    """Sweep the split line of an overlay from one edge to the other into frames
+    
+    The base and swipe images are rendered once for the extent, then frames
+    are composited in worker threads and streamed to a PNG sequence, or to
+    ffmpeg for GIF and video, with at most max_in_flight frames in memory.
+    """
+    def __init__(self, overlay, extent, size, frame_count=120, fps=30, workers=None):
+        self.overlay = overlay
+        self.extent = extent
+        self.size = size
+        self.frame_count = max(2, frame_count)
+        self.fps = fps
+        self.workers = workers or os.cpu_count() or 2
+        self.max_in_flight = self.workers * 2
+        # Frames sampled across the sweep for the GIF palette
+        self.palette_frames = 8
+        
+    def render_sources(self):
+        """Render the base and swipe images for the export extent, in parallel"""
+        jobs = {}
+        for name, layers, background in self.overlay.render_targets():
+            settings = self.overlay.map_settings(layers, background)
+            settings.setDevicePixelRatio(1.0)
+            settings.setOutputSize(self.size)
+            settings.setExtent(self.extent)
+            job = QgsMapRendererParallelJob(settings)
+            jobs[name] = job
+            metrics.count("render_jobs_started")
+            job.start()
+        for job in jobs.values():
+            job.waitForFinished()
+        return {name: job.renderedImage() for name, job in jobs.items()}
+        
+    def positions(self, length):
+        return [round(index * length / (self.frame_count - 1)) for index in range(self.frame_count)]
+        
+    def frame_path(self, path, index):
+        root, extension = os.path.splitext(path)
+        return f"{root}_{index:04d}{extension or '.png'}"
+        
+    def ffmpeg_command(self, path, width, height, palette=None):
+        command = ["ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "bgra",
+                   "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-"]
+        if palette:
+            # The palette is made beforehand, so ffmpeg streams the frames
+            # instead of holding all of them until the palette is known
+            command += ["-i", palette, "-lavfi", "paletteuse"]
+        else:
+            command += ["-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2", "-pix_fmt", "yuv420p"]
+        return command + [path]
+        
+    def make_palette(self, compose, length, width, height, palette):
+        """GIF palette from a few frames across the sweep, in a separate ffmpeg run"""
+        command = ["ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "bgra",
+                   "-s", f"{width}x{height}", "-i", "-", "-vf", "palettegen", palette]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        try:
+            count = self.palette_frames
+            for index in range(count):
+                self.write_frame_bytes(process, compose(round(index * length / (count - 1))))
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to make the GIF palette (exit status {process.returncode})")
+        
+    def export(self, path, progress=None):
+        """Write the animation to path, returns False if cancelled
+        
+        progress is called with the number of written frames and returns
+        False to cancel.
+        """
+        direction = self.overlay.swipe_direction
+        if direction not in ["right", "left", "top", "bottom"]:
+            raise ValueError("Animated export works with the split directions only")
+        images = self.render_sources()
+        base = images["base"].convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        top = images["top"].convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        width, height = base.width(), base.height()
+        length = width if direction in ["right", "left"] else height
+        
+        png_sequence = path.lower().endswith(".png")
+        if not png_sequence and shutil.which("ffmpeg") is None:
+            raise RuntimeError("GIF and video export need ffmpeg on the PATH")
+            
+        compose = partial(composite_swipe_frame, base, top, direction,
+                          layer_opacity=self.overlay.layer_opacity,
+                          line_color=self.overlay.line_color, line_width=self.overlay.line_width)
+        
+        palette = None
+        if path.lower().endswith(".gif"):
+            handle, palette = tempfile.mkstemp(suffix=".png")
+            os.close(handle)
+        try:
+            if palette:
+                self.make_palette(compose, length, width, height, palette)
+            return self.write_frames(path, compose, length, width, height, palette, progress)
+        finally:
+            if palette:
+                os.remove(palette)
+                
+    def write_frames(self, path, compose, length, width, height, palette, progress):
+        """Composite the frames in worker threads and write them in order"""
+        png_sequence = path.lower().endswith(".png")
+        process = None
+        if not png_sequence:
+            process = subprocess.Popen(self.ffmpeg_command(path, width, height, palette), stdin=subprocess.PIPE)
+        
+        def write_frame(index, frame):
+            if png_sequence:
+                frame_path = self.frame_path(path, index)
+                if not frame.save(frame_path, "PNG"):
+                    raise OSError(f"Could not write {frame_path}")
+                return None
+            return frame
+            
+        def render_frame(index, position):
+            # Compositing and PNG encoding both run in the worker
+            return write_frame(index, compose(position))
+            
+        written = 0
+        cancelled = False
+        in_flight = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for index, position in enumerate(self.positions(length)):
+                    if len(in_flight) >= self.max_in_flight:
+                        written = self.write_result(in_flight.popleft(), process, written)
+                        if progress and progress(written) is False:
+                            cancelled = True
+                            break
+                    in_flight.append(executor.submit(render_frame, index, position))
+                # Frames are written in order, so drain the window front to back
+                while in_flight:
+                    future = in_flight.popleft()
+                    if cancelled:
+                        future.cancel()
+                        continue
+                    written = self.write_result(future, process, written)
+                    if progress and progress(written) is False:
+                        cancelled = True
+        finally:
+            if process is not None:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    # ffmpeg already exited, its exit status tells why
+                    pass
+                process.wait()
+                
+        if process is not None:
+            if cancelled:
+                # Do not leave a truncated GIF or video behind
+                if os.path.exists(path):
+                    os.remove(path)
+            elif process.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed to encode {path} (exit status {process.returncode})")
+        return not cancelled
+        
+    def write_result(self, future, process, written):
+        frame = future.result()
+        if process is not None:
+            self.write_frame_bytes(process, frame)
+        return written + 1
+        
+    def write_frame_bytes(self, process, frame):
+        bits = frame.constBits()
+        bits.setsize(frame.bytesPerLine() * frame.height())
+        process.stdin.write(bytes(bits))
 
 class SplitSwipeTool(QgsMapTool):
-    def __init__(self, canvas, layer, line_color, line_width, control_panel, swipe_direction="right", layer_opacity=0.0):
+    def __init__(self, canvas, layers, line_color, line_width, control_panel, swipe_direction="right", layer_opacity=0.0, max_fps=60, tile_cache=None,
+                 *, series=None, prefetch_count=2, lens_shape="circle", lens_size=300, lens_magnification=1.0,
+                 preview_ratio=0.25, refine_delay_ms=400, simplified_layers=None, difference=False, linked_canvases=None):
         super().__init__(canvas)
         self.canvas = canvas
-        self.layer = layer
+        self.layers = list(layers)
+        self.tile_cache = tile_cache
+        
+        # Time series: ordered layers swiped one at a time, with the
+        # prefetch_count previous and next dates rendered ahead
+        self.series = list(series or [])
+        self.series_index = 0
+        self.prefetch_count = prefetch_count
+        if self.series:
+            self.layers = [self.series[0]]
         self.control_panel = control_panel
         self.overlay = None
+        
+        # Linked mode: overlays on other canvases follow the split of this one
+        # and share its tile cache
+        self.linked_canvases = [linked for linked in (linked_canvases or []) if linked is not canvas]
+        self.linked_overlays = []
+        self.identify_index = None
+        self.linked_slots = []
+        for linked in self.linked_canvases:
+            slot = partial(self.unlink_canvas, linked)
+            linked.destroyed.connect(slot)
+            self.linked_slots.append((linked, slot))
         self.dragging = False
         self.last_mouse_pos = None
         self.swipe_direction = swipe_direction
@@ -547,59 +2698,216 @@ class SplitSwipeTool(QgsMapTool):
         self.line_color = line_color
         self.line_width = line_width
         
+        self.lens_shape = lens_shape
+        self.lens_size = lens_size
+        self.lens_magnification = lens_magnification
+        
+        self.preview_ratio = preview_ratio
+        self.refine_delay_ms = refine_delay_ms
+        self.simplified_layers = set(simplified_layers or [])
+        self.difference = difference
+        
+        # Frame scheduler: mouse moves only record the latest position,
+        # which is flushed to the overlay at most once per frame
+        self.max_fps = max_fps
+        self.pending_position = None
+        self.last_flush_time = 0.0
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.timeout.connect(self.flush_split_position)
+        
         # Set cursor based on direction
         self.update_cursor()
     
     def update_cursor(self):
         """Update cursor based on direction"""
-        if self.swipe_direction in ["right", "left"]:
+        if self.swipe_direction == "lens":
+            self.setCursor(QCursor(Qt.CrossCursor))
+        elif self.swipe_direction == "quad":
+            self.setCursor(QCursor(Qt.SizeAllCursor))
+        elif self.swipe_direction in ["right", "left"]:
             self.setCursor(QCursor(Qt.SizeHorCursor))
         else:  # top, bottom
             self.setCursor(QCursor(Qt.SizeVerCursor))
     
     def create_overlay(self):
         """Create overlay with current settings"""
-        # Remove previous overlay if exists
-        if self.overlay:
-            self.overlay.cleanup()
-            self.canvas.scene().removeItem(self.overlay)
-            self.overlay = None
+        # Remove previous overlays if they exist
+        self.remove_overlays()
             
-        self.overlay = SplitSwipeOverlay(self.canvas, self.layer, self.line_color, self.line_width, self.swipe_direction)
+        self.overlay = self.new_overlay(self.canvas)
+        self.overlay.difference_listener = self.control_panel.difference_changed
+        self.overlay.report_difference()
+        self.linked_overlays = [self.new_overlay(linked) for linked in self.linked_canvases]
         
         # Set initial position
-        if self.swipe_direction in ["right", "left"]:
-            self.overlay.set_split_position(self.canvas.width() // 2)
-        else:  # top, bottom
-            self.overlay.set_split_position(self.canvas.height() // 2)
+        self.move_overlays_to(QPoint(self.canvas.width() // 2, self.canvas.height() // 2))
+        
+    def new_overlay(self, canvas):
+        prefetch_layers = self.series_neighbours() if self.series else None
+        # Everything the first render depends on goes to the constructor
+        overlay = SplitSwipeOverlay(canvas, self.layers, self.line_color, self.line_width, self.swipe_direction, self.layer_opacity, self.tile_cache,
+                                    self.series, prefetch_layers=prefetch_layers, lens_shape=self.lens_shape, lens_size=self.lens_size,
+                                    lens_magnification=self.lens_magnification, preview_ratio=self.preview_ratio,
+                                    refine_delay_ms=self.refine_delay_ms, simplified_layers=self.simplified_layers)
+        overlay.set_difference(self.difference)
+        return overlay
+        
+    def overlays(self):
+        """The overlay of this canvas followed by those of the linked canvases"""
+        if not self.overlay:
+            return []
+        return [self.overlay] + self.linked_overlays
+        
+    def remove_overlays(self):
+        for overlay in self.overlays():
+            try:
+                overlay.cleanup()
+            except RuntimeError:
+                # Its canvas is already gone
+                pass
+        self.overlay = None
+        self.linked_overlays = []
+        
+    def unlink_canvas(self, canvas, *args):
+        """A linked map view was closed - its overlay went with it"""
+        for overlay in self.linked_overlays:
+            if overlay.canvas is canvas:
+                # Cancels its jobs and gives back its claims and image budget
+                try:
+                    overlay.cleanup()
+                except RuntimeError:
+                    # Its canvas is already gone
+                    pass
+        self.linked_overlays = [overlay for overlay in self.linked_overlays if overlay.canvas is not canvas]
+        self.linked_canvases = [linked for linked in self.linked_canvases if linked is not canvas]
+        
+    def move_overlays_to(self, pos):
+        """Move the split of every overlay; linked canvases get the same relative position"""
+        self.overlay.move_split_to(pos)
+        width = max(1, self.canvas.width())
+        height = max(1, self.canvas.height())
+        for overlay in self.linked_overlays:
+            linked = overlay.canvas
+            overlay.move_split_to(QPoint(round(pos.x() * linked.width() / width),
+                                         round(pos.y() * linked.height() / height)))
             
+    def frame_interval(self):
+        """Minimum time in seconds between two overlay repaints"""
+        fps = self.max_fps if self.max_fps and self.max_fps > 0 else 60
+        try:
+            # Never repaint faster than the display can show
+            refresh_rate = self.canvas.screen().refreshRate()
+            if refresh_rate > 0:
+                fps = min(fps, refresh_rate)
+        except Exception:
+            pass
+        return 1.0 / fps
+    
+    def schedule_split_position(self, pos):
+        """Record the latest split position (a canvas point) and flush it on the next frame"""
+        self.pending_position = pos
+        if self.frame_timer.isActive():
+            # A flush is already scheduled - intermediate positions are dropped
+            return
+            
+        elapsed = time.monotonic() - self.last_flush_time
+        delay = max(0.0, self.frame_interval() - elapsed)
+        self.frame_timer.start(int(delay * 1000))
+    
+    def flush_split_position(self):
+        """Apply the pending split position to the overlay"""
+        self.frame_timer.stop()
+        if self.pending_position is None:
+            return
+            
+        pos = self.pending_position
+        self.pending_position = None
+        self.last_flush_time = time.monotonic()
+        if self.overlay:
+            self.move_overlays_to(pos)
+    
+    def series_neighbours(self):
+        """Previous and next dates to prefetch, nearest first"""
+        neighbours = []
+        for distance in range(1, self.prefetch_count + 1):
+            for index in (self.series_index + distance, self.series_index - distance):
+                if 0 <= index < len(self.series):
+                    neighbours.append([self.series[index]])
+        return neighbours
+    
+    def set_series_index(self, index):
+        """Swipe another date of the time series"""
+        if not self.series:
+            return
+        index = max(0, min(index, len(self.series) - 1))
+        if index == self.series_index:
+            return
+            
+        self.series_index = index
+        self.layers = [self.series[index]]
+        for overlay in self.overlays():
+            overlay.set_layers(self.layers, self.series_neighbours())
+        self.control_panel.series_index_changed(index, self.series[index])
+    
+    def wheelEvent(self, event):
+        # Shift+wheel zooms the lens, Ctrl+wheel resizes it
+        if self.swipe_direction != "lens" or not self.overlay:
+            event.ignore()
+            return
+        step = 1 if event.angleDelta().y() > 0 else -1
+        if event.modifiers() & Qt.ShiftModifier:
+            self.lens_magnification = max(1.0, self.lens_magnification * (2.0 if step > 0 else 0.5))
+        elif event.modifiers() & Qt.ControlModifier:
+            self.lens_size = max(60, min(self.lens_size + step * 40, 1200))
+        else:
+            event.ignore()
+            return
+        for overlay in self.overlays():
+            overlay.set_lens(self.lens_shape, self.lens_size, self.lens_magnification)
+        event.accept()
+    
+    def keyPressEvent(self, event):
+        # Step through the time series without leaving the canvas. The canvas
+        # reads it the other way round: ignore() means the tool used the key,
+        # accept() lets the canvas run its own shortcuts (panning, zooming)
+        if self.series and event.key() in (Qt.Key_PageDown, Qt.Key_BracketRight):
+            self.set_series_index(self.series_index + 1)
+            event.ignore()
+        elif self.series and event.key() in (Qt.Key_PageUp, Qt.Key_BracketLeft):
+            self.set_series_index(self.series_index - 1)
+            event.ignore()
+        else:
+            event.accept()
+    
     def update_overlay_direction(self):
         """Update overlay direction"""
-        if self.overlay:
-            self.overlay.set_direction(self.swipe_direction)
+        for overlay in self.overlays():
+            overlay.set_direction(self.swipe_direction)
         
         self.update_cursor()
     
+    def set_difference(self, enabled):
+        self.difference = enabled
+        for overlay in self.overlays():
+            overlay.set_difference(enabled)
+            
+    def set_simplified_layers(self, layer_ids):
+        """Vector layers drawn simplified and without labels while interacting"""
+        self.simplified_layers = set(layer_ids)
+        for overlay in self.overlays():
+            overlay.set_simplified_layers(self.simplified_layers)
+    
+    @metrics.timed("update_layer_opacity")
     def update_layer_opacity(self):
-        """Update layer opacity based on current position"""
-        if not self.layer or not self.overlay:
-            return
-            
-        # Apply the layer opacity setting to the appropriate side based on direction
-        if self.swipe_direction == "right":
-            # Right side: full opacity, left side: configured opacity
-            self.layer.setOpacity(self.layer_opacity)
-        elif self.swipe_direction == "left":
-            # Left side: full opacity, right side: configured opacity
-            self.layer.setOpacity(self.layer_opacity)
-        elif self.swipe_direction == "top":
-            # Top side: full opacity, bottom side: configured opacity
-            self.layer.setOpacity(self.layer_opacity)
-        elif self.swipe_direction == "bottom":
-            # Bottom side: full opacity, top side: configured opacity
-            self.layer.setOpacity(self.layer_opacity)
-            
-        self.layer.triggerRepaint()
+        """Update layer opacity in the hidden area"""
+        if not self.layers or not self.overlay:
+            return
+            
+        # The hidden side is composited by the overlay from its cached
+        # render, so no layer re-render is needed
+        for overlay in self.overlays():
+            overlay.set_layer_opacity(self.layer_opacity)
     
     def activate(self):
         super().activate()
@@ -610,28 +2918,121 @@ class SplitSwipeTool(QgsMapTool):
         # It might be managed by control panel
         self.cleanup_soft()
         super().deactivate()
-        self.control_panel.tool_deactivated()
+        if self.control_panel:
+            self.control_panel.tool_deactivated()
         
     def cleanup(self):
         """Complete cleanup"""
         self.cleanup_soft()
         
+    def dispose(self):
+        """End of the tool: overlays, timers, signal connections and the tool itself
+        
+        The only way a tool should go away, so nothing it created outlives it.
+        """
+        if self.canvas.mapTool() is self:
+            # Deactivates the tool, which removes its overlays
+            self.canvas.unsetMapTool(self)
+        self.cleanup()
+        self.release_identify()
+        for linked, slot in self.linked_slots:
+            try:
+                linked.destroyed.disconnect(slot)
+            except (RuntimeError, TypeError):
+                pass
+        self.linked_slots = []
+        self.linked_canvases = []
+        self.control_panel = None
+        self.deleteLater()
+        
     def cleanup_soft(self):
         """Soft cleanup without affecting control panel status"""
-        if self.overlay:
-            self.overlay.cleanup()
-            self.canvas.scene().removeItem(self.overlay)
-            self.overlay = None
+        self.remove_overlays()
             
-        if self.layer:
-            self.layer.setOpacity(1)
-            self.layer.triggerRepaint()
-            
-        self.canvas.refresh()
+        # Hidden-side opacity only ever lived in the overlay, so the layer
+        # and the canvas need no repaint here
+        self.frame_timer.stop()
+        self.pending_position = None
         self.dragging = False
         self.last_mouse_pos = None
 
+    @metrics.timed("identify")
+    def identify(self, pos):
+        """Features and pixel values of the swiped and the base layers at a canvas position"""
+        if not self.overlay:
+            return
+        if self.identify_index is None:
+            self.identify_index = SwipeIdentifyIndex(self.canvas)
+            # From now on rebuild the indexes in the background once a new view is drawn
+            self.canvas.mapCanvasRefreshed.connect(self.prepare_identify)
+            
+        point = self.toMapCoordinates(pos)
+        tolerance = IDENTIFY_TOLERANCE * self.canvas.mapUnitsPerPixel()
+        visible = self.overlay.visible_swiped_layers(pos)
+        base_layers = self.overlay.render_targets()[0][1]
+        
+        # Which side the user actually sees at this point
+        sides = [("Swiped", visible or self.overlay.layers, not visible), ("Base", base_layers, bool(visible))]
+        lines = []
+        for title, layers, hidden in sides:
+            section = [self.identify_layer(layer, point, tolerance) for layer in layers]
+            section = [line for line in section if line]
+            if section:
+                lines.append(title + (" (hidden here)" if hidden else "") + ":")
+                lines.extend(section)
+        self.control_panel.identify_results("\n".join(lines) if lines else "Nothing here")
+        
+    def identify_layer(self, layer, point, tolerance):
+        """One result line of a layer, or None"""
+        if isinstance(layer, QgsRasterLayer):
+            transform = QgsCoordinateTransform(self.canvas.mapSettings().destinationCrs(), layer.crs(), QgsProject.instance())
+            try:
+                layer_point = transform.transform(point)
+            except QgsCsException:
+                return None
+            result = layer.dataProvider().identify(layer_point, QgsRaster.IdentifyFormatValue)
+            values = result.results() if result.isValid() else {}
+            if not values or all(value is None for value in values.values()):
+                return None
+            return f"  {layer.name()}: " + ", ".join(f"band {band} = {value}" for band, value in values.items())
+            
+        if not isinstance(layer, QgsVectorLayer):
+            return None
+        try:
+            feature_ids = self.identify_index.feature_ids_at(layer, point, tolerance)
+        except Exception:
+            return f"  {layer.name()}: index unavailable"
+        if not feature_ids:
+            return None
+        # Attributes only for the few features listed
+        expression = QgsExpression(layer.displayExpression())
+        context = QgsExpressionContext(QgsExpressionContextUtils.globalProjectLayerScopes(layer))
+        names = []
+        for feature in layer.getFeatures(QgsFeatureRequest().setFilterFids(feature_ids[:IDENTIFY_LIMIT])):
+            context.setFeature(feature)
+            names.append(str(expression.evaluate(context)))
+        more = f" (+{len(feature_ids) - IDENTIFY_LIMIT} more)" if len(feature_ids) > IDENTIFY_LIMIT else ""
+        return f"  {layer.name()}: " + ", ".join(names) + more
+        
+    def prepare_identify(self):
+        if self.identify_index and self.overlay:
+            self.identify_index.prepare(list(self.overlay.layers) + self.overlay.render_targets()[0][1])
+        
+    def release_identify(self):
+        if self.identify_index is None:
+            return
+        try:
+            self.canvas.mapCanvasRefreshed.disconnect(self.prepare_identify)
+        except (RuntimeError, TypeError):
+            pass
+        self.identify_index.release()
+        self.identify_index = None
+
     def canvasPressEvent(self, event):
+        # Ctrl+click identifies both sides instead of moving the line
+        if event.button() == Qt.LeftButton and event.modifiers() & Qt.ControlModifier:
+            self.identify(event.pos())
+            return
         if event.button() == Qt.LeftButton:
             self.dragging = True
             self.last_mouse_pos = event.pos()
@@ -641,82 +3042,40 @@ class SplitSwipeTool(QgsMapTool):
                 self.create_overlay()
             
             # Set line position based on direction and mouse position
-            if self.swipe_direction in ["right", "left"]:
-                self.overlay.set_split_position(event.pos().x())
-            else:  # top, bottom
-                self.overlay.set_split_position(event.pos().y())
+            self.frame_timer.stop()
+            self.pending_position = None
+            self.move_overlays_to(event.pos())
             
             # Apply layer opacity based on direction
             self.update_layer_opacity()
             
             self.control_panel.update_status("🎯", f"Dragging - Layer Opacity: {int(self.layer_opacity * 100)}%")
 
+    @metrics.timed("canvasMoveEvent")
     def canvasMoveEvent(self, event):
-        if self.dragging and self.overlay:
+        # The lens follows the cursor, lines follow drags
+        if self.swipe_direction == "lens" and self.overlay and not self.dragging:
+            self.schedule_split_position(event.pos())
+        elif self.dragging and self.overlay:
             current_pos = event.pos()
             
-            # Move line based on direction
-            if self.swipe_direction in ["right", "left"]:
-                self.overlay.set_split_position(current_pos.x())
-            else:  # top, bottom
-                self.overlay.set_split_position(current_pos.y())
-            
-            # Update layer opacity based on position
-            self.update_layer_opacity_based_on_position(current_pos)
+            # Move line based on direction - coalesced to one repaint per frame
+            self.schedule_split_position(current_pos)
             
-            self.canvas.refresh()
             self.last_mouse_pos = current_pos
 
-    def update_layer_opacity_based_on_position(self, pos):
-        """Update layer opacity based on mouse position and direction"""
-        if not self.layer:
-            return
-            
-        canvas_width = self.canvas.width()
-        canvas_height = self.canvas.height()
-        
-        if self.swipe_direction == "right":
-            # For right swipe: left of line shows layer with configured opacity, right shows full opacity
-            if pos.x() <= 0:
-                self.layer.setOpacity(1.0)  # Fully visible when line is at left edge
-            elif pos.x() >= canvas_width:
-                self.layer.setOpacity(self.layer_opacity)  # Configured opacity when line is at right edge
-            else:
-                # Gradual transition (optional - you can remove this for instant change)
-                self.layer.setOpacity(self.layer_opacity)
-                
-        elif self.swipe_direction == "left":
-            # For left swipe: right of line shows layer with configured opacity, left shows full opacity
-            if pos.x() <= 0:
-                self.layer.setOpacity(self.layer_opacity)  # Configured opacity when line is at left edge
-            elif pos.x() >= canvas_width:
-                self.layer.setOpacity(1.0)  # Fully visible when line is at right edge
-            else:
-                self.layer.setOpacity(self.layer_opacity)
-                
-        elif self.swipe_direction == "top":
-            # For top swipe: below line shows layer with configured opacity, above shows full opacity
-            if pos.y() <= 0:
-                self.layer.setOpacity(1.0)  # Fully visible when line is at top edge
-            elif pos.y() >= canvas_height:
-                self.layer.setOpacity(self.layer_opacity)  # Configured opacity when line is at bottom edge
-            else:
-                self.layer.setOpacity(self.layer_opacity)
-                
-        elif self.swipe_direction == "bottom":
-            # For bottom swipe: above line shows layer with configured opacity, below shows full opacity
-            if pos.y() <= 0:
-                self.layer.setOpacity(self.layer_opacity)  # Configured opacity when line is at top edge
-            elif pos.y() >= canvas_height:
-                self.layer.setOpacity(1.0)  # Fully visible when line is at bottom edge
-            else:
-                self.layer.setOpacity(self.layer_opacity)
-            
-        self.layer.triggerRepaint()
-
     def canvasReleaseEvent(self, event):
         if event.button() == Qt.LeftButton and self.dragging:
+            # Make sure the line ends exactly where the mouse was released
+            self.pending_position = event.pos()
+            self.flush_split_position()
+            
             self.dragging = False
             self.last_mouse_pos = None
             
-            self.control_panel.update_status("🔄", f"Active - Layer Opacity: {int(self.layer_opacity * 100)}%")
\ No newline at end of file
+            status = f"Active - Layer Opacity: {int(self.layer_opacity * 100)}%\n{self.control_panel.cache_memory_text()}"
+            # The swipe side figure needs no recomputation, only the column or row sums
+            stats = self.overlay.difference_stats() if self.overlay else None
+            if stats is not None:
+                status += f"\n{difference_text(stats)}"
+            self.control_panel.update_status("🔄", status)
\ No newline at end of file